@@ -1,7 +1,11 @@
 from .bitstream_writer import BitStreamWriter
 from .bitstream_reader import BitStreamReader
+from .bytestream_writer import ByteStreamWriter
+from .bytestream_reader import ByteStreamReader
 
 __all__ = [
     "BitStreamWriter",
-    "BitStreamReader"
+    "BitStreamReader",
+    "ByteStreamWriter",
+    "ByteStreamReader"
 ]
@@ -18,6 +18,16 @@ class BitStreamReader:
     def read_bytes(self, n_bytes: int) -> bytes:
         return self._stream.read(f"bytes:{n_bytes}")
 
+    def read_sub_block_spans(self) -> list[tuple[int, int]]:
+        spans = []
+        while (size := self.read_unsigned_integer(1, 'bytes')) != 0:
+            spans.append((self._stream.bytepos, size))
+            self._stream.bytepos += size
+        return spans
+
+    def join_spans(self, spans: list[tuple[int, int]]) -> bytes:
+        return b''.join([self._stream[offset * 8:(offset + length) * 8].bytes for offset, length in spans])
+
     def read_decoded(self, n_bytes: int, encoding='utf-8', errors='strict') -> str:
         return self._stream.read(f"bytes:{n_bytes}").decode(encoding, errors)
 
@@ -0,0 +1,126 @@
+import struct
+from typing import Literal
+
+BITS_IN_BYTE = 8
+UNSIGNED_LE_FORMATS = {
+    1: struct.Struct("<B"),
+    2: struct.Struct("<H"),
+    4: struct.Struct("<I"),
+}
+
+
+class ByteStreamReader:
+    """
+    reader over bytes with a plain integer offset.
+    byte reads must be byte aligned, bit reads are taken MSB-first from the current byte, the same order as
+    BitStreamReader, so the two readers can be swapped.
+    """
+
+    def __init__(self, data: bytes | bytearray | memoryview = b'') -> None:
+        super().__init__()
+        self._data = memoryview(data).cast("B")
+        self._pos = 0
+        self._bit_pos = 0
+
+    @property
+    def stream(self) -> memoryview:
+        return self._data
+
+    @property
+    def pos(self) -> int:
+        """the offset of the next byte to read"""
+        return self._pos
+
+    @pos.setter
+    def pos(self, pos: int) -> None:
+        self._pos = pos
+        self._bit_pos = 0
+
+    def release(self) -> None:
+        """release the view over the data, so a memory mapped file can be closed"""
+        self._data.release()
+
+    def _take(self, n_bytes: int) -> int:
+        if self._bit_pos:
+            raise ValueError(f"byte read at bit {self._bit_pos} of byte {self._pos}, the stream is not byte aligned")
+        start = self._pos
+        if start + n_bytes > len(self._data):
+            raise IndexError(f"can not read {n_bytes} bytes at {start}, the stream length is {len(self._data)}")
+        self._pos = start + n_bytes
+        return start
+
+    def _read_bits(self, n: int) -> int:
+        value = 0
+        while n:
+            if self._pos >= len(self._data):
+                raise IndexError(f"can not read bits at {self._pos}, the stream length is {len(self._data)}")
+            available = BITS_IN_BYTE - self._bit_pos
+            taken = min(n, available)
+            shift = available - taken
+            value = value << taken | (self._data[self._pos] >> shift) & ((1 << taken) - 1)
+            n -= taken
+            self._bit_pos += taken
+            if self._bit_pos == BITS_IN_BYTE:
+                self._pos += 1
+                self._bit_pos = 0
+        return value
+
+    def read_bytes(self, n_bytes: int) -> bytes:
+        start = self._take(n_bytes)
+        return self._data[start:self._pos].tobytes()
+
+    def read_sub_block_spans(self) -> list[tuple[int, int]]:
+        """
+        read data sub blocks (a size byte and then the data) up to the block terminator (size 0).
+        nothing is copied, the (offset, length) of the data of every sub block in the stream is returned.
+        """
+        start = self._take(0)
+        data = self._data
+        length = len(data)
+        spans = []
+        pos = start
+        while pos < length and (size := data[pos]):
+            spans.append((pos + 1, size))
+            pos += size + 1
+        if pos >= length:
+            raise IndexError(f"sub blocks from {start} are not terminated, the stream length is {length}")
+        self._pos = pos + 1
+        return spans
+
+    def join_spans(self, spans: list[tuple[int, int]]) -> bytes:
+        """copy the given (offset, length) spans of the stream into one bytes object"""
+        data = self._data
+        return b''.join([data[offset: offset + length] for offset, length in spans])
+
+    def read_decoded(self, n_bytes: int, encoding='utf-8', errors='strict') -> str:
+        return self.read_bytes(n_bytes).decode(encoding, errors)
+
+    def read_bool(self) -> bool:
+        return bool(self._read_bits(1))
+
+    def read_unsigned_integer(self, n: int, unit: Literal['bits', 'bytes']) -> int:
+        if unit == "bits":
+            return self._read_bits(n)
+        elif unit == "bytes":
+            start = self._take(n)
+            if n in UNSIGNED_LE_FORMATS:
+                return UNSIGNED_LE_FORMATS[n].unpack_from(self._data, start)[0]
+            return int.from_bytes(self._data[start:self._pos], "little")
+        else:
+            raise ValueError("incorrect Unit passed, can be 'bits' or 'bytes'")
+
+    def read_hex(self, n: int, unit: Literal['bits', 'bytes']) -> str:
+        if unit == "bits":
+            return format(self._read_bits(n), "x").zfill(n // 4)
+        elif unit == "bytes":
+            return self.read_bytes(n).hex()
+        else:
+            raise ValueError("incorrect Unit passed, can be 'bits' or 'bytes'")
+
+    def skip(self, n: int, unit: Literal['bits', 'bytes']) -> None:
+        if unit == "bits":
+            self._read_bits(n)
+        elif unit == "bytes":
+            self._take(n)
+        else:
+            raise ValueError("incorrect Unit passed, can be 'bits' or 'bytes'")
@@ -0,0 +1,81 @@
+from typing import Literal, BinaryIO
+
+BITS_IN_BYTE = 8
+
+
+class ByteStreamWriter:
+    """
+    writer that appends to a growing bytearray.
+    bit writes are gathered MSB-first in a small accumulator until they fill a byte, the same order as
+    BitStreamWriter, so the two writers can be swapped.
+    """
+
+    def __init__(self, stream: bytearray | None = None) -> None:
+        super().__init__()
+        if stream is not None:
+            self._stream = stream
+        else:
+            self._stream = bytearray()
+        self._bit_buffer = 0
+        self._bits_in_buffer = 0
+
+    def _check_aligned(self) -> None:
+        if self._bits_in_buffer:
+            raise ValueError(f"{self._bits_in_buffer} bits are waiting to fill a byte, the stream is not byte aligned")
+
+    def _write_bits(self, value: int, length: int) -> None:
+        if value >= 1 << length:
+            raise ValueError(f"{value} is too large to be written in {length} bits")
+        self._bit_buffer = self._bit_buffer << length | value
+        self._bits_in_buffer += length
+        while self._bits_in_buffer >= BITS_IN_BYTE:
+            self._bits_in_buffer -= BITS_IN_BYTE
+            self._stream.append(self._bit_buffer >> self._bits_in_buffer)
+            self._bit_buffer &= (1 << self._bits_in_buffer) - 1
+
+    @property
+    def stream(self) -> bytearray:
+        return self._stream
+
+    def write_bytes(self, input_byte: bytes) -> None:
+        self._check_aligned()
+        self._stream += input_byte
+
+    def write_bool(self, input_bool: bool) -> None:
+        self._write_bits(int(input_bool), 1)
+
+    def write_unsigned_integer(self, input_num: int, length: int, unit: Literal['bits', 'bytes']) -> None:
+        if unit == "bits":
+            self._write_bits(int(input_num), length)
+        elif unit == "bytes":
+            self._check_aligned()
+            self._stream += input_num.to_bytes(length, "little")
+        else:
+            raise ValueError("incorrect Unit passed, can be 'bits' or 'bytes'")
+
+    def write_hex(self, input_hex: str, bytes_length: int) -> None:
+        self._write_bits(int(input_hex, 16), bytes_length)
+
+    def skip(self, length: int, unit: Literal['bits', 'bytes']):
+        if unit == "bits":
+            self._write_bits(0, length)
+        elif unit == "bytes":
+            self._check_aligned()
+            self._stream += bytes(length)
+        else:
+            raise ValueError("incorrect Unit passed, can be 'bits' or 'bytes'")
+
+    def to_file(self, file: BinaryIO) -> None:
+        self._check_aligned()
+        file.write(self._stream)
+
+    def flush(self, file: BinaryIO) -> None:
+        """write everything written so far to the file and empty the buffer"""
+        self.to_file(file)
+        self._stream.clear()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({bytes(self._stream)!r})"
+
+    def __str__(self):
+        return self._stream.hex()
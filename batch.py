@@ -0,0 +1,187 @@
+import argparse
+import os
+import resource
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from attrs import define
+
+from BitStream import ByteStreamWriter
+from reader_writer import read_gif, write_gif
+from utils import chunker
+
+MEGABYTE = 1024 * 1024
+DEFAULT_TIMEOUT_SECONDS = 60
+
+
+@define
+class FileResult:
+    filename: str
+    size: int
+    ok: bool
+    reason: str | None = None
+    seconds: float = 0.0
+
+
+class FileTimeout(Exception):
+    pass
+
+
+def limit_memory(max_memory: int | None) -> None:
+    """pool initializer, caps the address space of every worker process to max_memory MB"""
+    if max_memory:
+        limit = max_memory * MEGABYTE
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def raise_timeout(signum, frame):
+    raise FileTimeout()
+
+
+def temp_path_of(output_path: str) -> str:
+    """the temporary file of the output, the same for every run so a worker that died can be cleaned up after"""
+    return os.path.join(os.path.dirname(output_path), f".{os.path.basename(output_path)}.tmp")
+
+
+def remove_temp_file(output_path: str) -> None:
+    try:
+        os.unlink(temp_path_of(output_path))
+    except FileNotFoundError:
+        pass
+
+
+def write_atomic(output_path: str, res: ByteStreamWriter) -> None:
+    """write to a temporary file next to the output and rename it, so a failed run never leaves half a gif"""
+    temp_path = temp_path_of(output_path)
+    try:
+        with open(temp_path, "wb") as temp_file:
+            res.to_file(temp_file)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        remove_temp_file(output_path)
+        raise
+
+
+def transcode_file(input_path: str, output_path: str, max_clean: bool, timeout: int, remux: bool = False) -> FileResult:
+    """read and rewrite one gif, every failure is returned as the reason instead of being raised"""
+    filename = os.path.basename(input_path)
+    size = os.path.getsize(input_path)
+    start = time.perf_counter()
+
+    signal.signal(signal.SIGALRM, raise_timeout)
+    signal.alarm(timeout)
+    try:
+        gif = read_gif(input_path, False, lazy=remux)
+        write_atomic(output_path, write_gif(gif, max_clean, remux=remux))
+        reason = None
+    except FileTimeout:
+        reason = f"timed out after {timeout} seconds"
+    except MemoryError:
+        reason = "memory cap exceeded"
+    except Exception as e:
+        reason = f"{type(e).__name__}: {e}"
+    finally:
+        signal.alarm(0)
+
+    return FileResult(filename, size, reason is None, reason, time.perf_counter() - start)
+
+
+def main(gif_dir: str, output_dir: str, workers: int | None = None, timeout: int = DEFAULT_TIMEOUT_SECONDS,
+         max_memory: int | None = None, max_clean: bool = False, remux: bool = False) -> list[FileResult]:
+    os.makedirs(output_dir, exist_ok=True)
+    filenames = sorted(filename for filename in os.listdir(gif_dir) if filename.endswith(".gif"))
+    tasks = {filename: (os.path.join(gif_dir, filename), os.path.join(output_dir, filename), max_clean, timeout, remux)
+             for filename in filenames}
+
+    results: list[FileResult] = []
+    start = time.perf_counter()
+    unfinished = run_pool(tasks, workers, max_memory, results)
+    if unfinished:
+        # a worker died and broke the pool, the files it left are run again each in a process of its own, so only
+        # the file that kills its worker fails
+        run_isolated({filename: tasks[filename] for filename in unfinished}, workers, max_memory, results)
+
+    print_summary(results, time.perf_counter() - start)
+    return results
+
+
+def run_pool(tasks: dict[str, tuple], workers: int | None, max_memory: int | None,
+             results: list[FileResult]) -> list[str]:
+    """
+    Transcode the files in one process pool, their results are added to results.
+    :return: the files that were not finished because a worker process died, which breaks the whole pool
+    """
+    unfinished = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=limit_memory, initargs=(max_memory,)) as executor:
+        futures = {executor.submit(transcode_file, *task): filename for filename, task in tasks.items()}
+
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                add_result(results, future.result())
+            except BrokenProcessPool:
+                unfinished.append(filename)
+            except Exception as e:
+                add_result(results, worker_failure(filename, *tasks[filename][:2], e))
+    return sorted(unfinished)
+
+
+def run_isolated(tasks: dict[str, tuple], workers: int | None, max_memory: int | None,
+                 results: list[FileResult]) -> None:
+    """transcode every file in a process of its own, workers of them at a time, their results are added to results"""
+    for filenames in chunker(workers or os.cpu_count() or 1, list(tasks)):
+        executors = {filename: ProcessPoolExecutor(max_workers=1, initializer=limit_memory, initargs=(max_memory,))
+                     for filename in filenames}
+        try:
+            futures = {executors[filename].submit(transcode_file, *tasks[filename]): filename for filename in filenames}
+            for future in as_completed(futures):
+                filename = futures[future]
+                try:
+                    add_result(results, future.result())
+                except Exception as e:
+                    add_result(results, worker_failure(filename, *tasks[filename][:2], e))
+        finally:
+            for executor in executors.values():
+                executor.shutdown()
+
+
+def worker_failure(filename: str, input_path: str, output_path: str, error: Exception) -> FileResult:
+    """
+    The result of a file whose worker process itself died (killed by the system, crashed interpreter), the temporary
+    file it was writing is removed.
+    """
+    remove_temp_file(output_path)
+    return FileResult(filename, os.path.getsize(input_path), False, f"worker failed: {type(error).__name__}: {error}")
+
+
+def add_result(results: list[FileResult], result: FileResult) -> None:
+    results.append(result)
+    print(f"{'ok' if result.ok else 'FAILED'} {result.filename} ({result.seconds:.2f}s)")
+
+
+def print_summary(results: list[FileResult], total_seconds: float) -> None:
+    succeeded = [result for result in results if result.ok]
+    failed = [result for result in results if not result.ok]
+    total_megabytes = sum(result.size for result in succeeded) / MEGABYTE
+
+    print(f"processed {len(results)} files in {total_seconds:.2f}s: {len(succeeded)} succeeded, {len(failed)} failed")
+    if total_seconds > 0:
+        print(f"throughput: {len(succeeded) / total_seconds:.2f} files/s, {total_megabytes / total_seconds:.2f} MB/s")
+    for result in failed:
+        print(f"  {result.filename}: {result.reason}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Batch GIF Processing')
+    parser.add_argument('gif_dir', type=str, help='Directory with the origin GIF files')
+    parser.add_argument('output_dir', type=str, help='Directory where the new GIFs will be written')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes (default: cpu count)')
+    parser.add_argument('--timeout', type=int, default=DEFAULT_TIMEOUT_SECONDS, help='Seconds allowed per file')
+    parser.add_argument('--max_memory', type=int, default=None, help='Memory cap per worker process in MB')
+    parser.add_argument('--max_clean', action='store_true', help='Perform full cleanup to the GIFs')
+    parser.add_argument('--remux', action='store_true', help='Copy the image data of unchanged frames as is')
+    args = parser.parse_args()
+
+    main(args.gif_dir, args.output_dir, args.workers, args.timeout, args.max_memory, args.max_clean, args.remux)
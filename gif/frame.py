@@ -6,8 +6,14 @@ from attrs import define, field
 
 @define
 class Frame:
-    image_data: list[bytes] = field(factory=list, repr=False)
-    raw_data: list[bytes] = field(factory=list, repr=False)
+    # palette index of every pixel of the frame, one byte per pixel
+    _index_data: bytes | None = field(default=b'', repr=False)
+    # the color table the indices point to (the local color table or the global one)
+    color_table: list[bytes] | None = field(default=None, repr=False)
+    # pixels with this index are transparent, None if the frame has no transparency
+    transparent_index: int | None = field(default=None)
+    # RGB of the composited canvas after this frame is drawn, 3 bytes per pixel. only set when images are created
+    _image_data: bytearray | None = field(default=None, repr=False)
 
     top: int = field(default=None)
     left: int = field(default=None)
@@ -22,9 +28,93 @@ class Frame:
     background_color_index: int = field(default=None)
     size_of_local_color_table: int = field(default=None)
 
-    img: Image = field(default=None)
+    _img: Image = field(default=None)
 
     local_color_table: list[bytes] = field(default=None)
     lzw_minimum_code_size: int = field(default=None)
 
     index_graphic_control_ex: int | None = field(default=None)
+
+    # the joined image data sub blocks as read from the file. in lazy mode they are decoded by decoder on the first
+    # access to index_data, decoder is None once the indices are decoded
+    compressed_data: bytes | None = field(default=None, repr=False)
+    # the indices compressed_data decodes to and the color table it was read with, while the frame still has both
+    # compressed_data can be written as is (remux)
+    decoded_index_data: bytes | None = field(default=None, repr=False, eq=False)
+    decoded_color_table: list[bytes] | None = field(default=None, repr=False, eq=False)
+    decoder: typing.Callable[["Frame"], bytes] | None = field(default=None, repr=False, eq=False)
+    # lazy images: compositor draws this frame on the canvas of the gif on the first access to the image, after
+    # previous_frame is drawn
+    compositor: typing.Callable[[], None] | None = field(default=None, repr=False, eq=False)
+    previous_frame: typing.Optional["Frame"] = field(default=None, repr=False, eq=False)
+
+    @property
+    def index_data(self) -> bytes:
+        if self._index_data is None:
+            self.load_index_data(self.decoder(self))
+        return self._index_data
+
+    @index_data.setter
+    def index_data(self, index_data: bytes) -> None:
+        self._index_data = index_data
+
+    def load_index_data(self, index_data: bytes) -> None:
+        """set the indices decoded from compressed_data"""
+        self._index_data = self.decoded_index_data = index_data
+        self.decoder = None
+
+    def is_unchanged(self, color_table: list[bytes]) -> bool:
+        """compressed_data still encodes the pixels of the frame with color_table"""
+        return (self.compressed_data is not None and color_table == self.decoded_color_table and
+                (self._index_data is None or self._index_data == self.decoded_index_data))
+
+    @property
+    def image_data(self) -> bytearray | None:
+        self.composite()
+        return self._image_data
+
+    @image_data.setter
+    def image_data(self, image_data: bytearray | None) -> None:
+        self._image_data = image_data
+
+    @property
+    def img(self) -> Image | None:
+        self.composite()
+        return self._img
+
+    @img.setter
+    def img(self, img: Image | None) -> None:
+        self._img = img
+
+    def composite(self) -> None:
+        """
+        run the pending compositors of this frame and of the frames it is drawn on, oldest first,
+        so a long chain of lazy frames does not recurse
+        """
+        chain = []
+        frame = self
+        while frame is not None and frame.compositor is not None:
+            chain.append(frame)
+            frame = frame.previous_frame
+
+        for frame in reversed(chain):
+            compositor, frame.compositor = frame.compositor, None
+            compositor()
+
+    @property
+    def raw_data(self) -> list[bytes]:
+        """the RGB color of every pixel of the frame, built from the palette indices on demand"""
+        if self.color_table is None:
+            return []
+        return [self.color_table[index] for index in self.index_data]
+
+    @property
+    def transparency_mask(self) -> bytes | None:
+        """1 for every transparent pixel and 0 for the rest, None if the frame has no transparency"""
+        # imported here, reader_writer imports gif
+        from reader_writer.constants import PALETTE_SIZE
+
+        if self.transparent_index is None:
+            return None
+        mask_table = bytes(index == self.transparent_index for index in range(PALETTE_SIZE))
+        return self.index_data.translate(mask_table)
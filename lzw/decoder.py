@@ -1,108 +1,91 @@
-import io
-import math
-
-from bitstring import ConstBitStream
 from reader_writer.constants import *
 
 
-def initialize_code_table(color_table_size: int) -> dict[int, str]:
+def initialize_code_table(color_table_size: int) -> list[bytes]:
     """
-    init dict which keys are int from 0 to size.
+    init list which index i hold the palette indices of code i.
+    the clear code and eof have no palette indices, so they hold empty bytes.
     @param color_table_size: size of color table
     @return:
     """
-
-    # init table with dict, clear code and eof
-    return {i: str(i) for i in range(color_table_size + EOI_AND_CC)}
-
-
-def get_decode_element(stream: ConstBitStream, reading_size: int) -> int:
-    if stream.pos - reading_size < 0:
-        reading_size = stream.pos
-
-    stream.pos -= reading_size
-    value: int = stream.read(f'uint{reading_size}')
-    stream.pos -= reading_size
-    return value
+    return [bytes((i,)) for i in range(color_table_size)] + [b''] * EOI_AND_CC
 
 
-def index_to_binary(element: str, writing_size: int):
-    return bytes(''.join([bin(int(val))[BINARY_HEADER_LEN:].zfill(writing_size)
-                          for val in element.split(',')]), 'utf-8')
-
-
-def update_reading_size(table_size: int, code_size: int):
-    if table_size == int(math.pow(2, code_size)) and code_size < MAX_WRITING_SIZE:
+def update_reading_size(table_size: int, code_size: int) -> int:
+    if table_size == 1 << code_size and code_size < MAX_WRITING_SIZE:
         return code_size + 1
     return code_size
 
 
-def get_first_element(concat_colors: str):
-    comma_index = concat_colors.find(",")
-    if comma_index != -1:
-        result = concat_colors[:comma_index]
-    else:
-        result = concat_colors
-    return result
-
-
-def lzw_decode(compressed_data: bytes, lzw_minimum_code_size: int):
+def lzw_decode(compressed_data: bytes, lzw_minimum_code_size: int) -> bytes:
     """
-    using lzw algorithm for compress data ang gif images
+    using lzw algorithm for decompress data of gif images.
+    the codes are read LSB-first straight from the compressed bytes, and every code is an index into the table.
     the table code look like this:
     _____|______
-      0  |  '0'
-      1  |  '1'
-      2  |  '2'
-      3  |  '3'
+      0  |  [0]
+      1  |  [1]
+      2  |  [2]
+      3  |  [3]
     ...
-     297 | '3','89'
-     """
+     297 | [3, 89]
+    @param compressed_data: the joined sub blocks of the image data
+    @param lzw_minimum_code_size: the lzw minimum code size of the frame
+    @return: the palette index of every pixel, one byte per pixel
+    """
+    color_table_size = 1 << lzw_minimum_code_size
+    clear_code = color_table_size
+    end_of_information_code = color_table_size + 1
 
-    writing_size = lzw_minimum_code_size
-    reading_size = lzw_minimum_code_size + 1
-    color_table_size = int(math.pow(2, lzw_minimum_code_size))
     table = initialize_code_table(color_table_size)
-    reading_size = update_reading_size(len(table), reading_size)
-
-    # add the start of reading
-    clear_code = int(table[len(table) - EOI_AND_CC])
-
-    #  add the enf of reading
-    end_of_information_code = int(table[(len(table) - 1)])
-
-    stream = ConstBitStream(compressed_data[::-1])
-
-    decompressed_data = io.BytesIO()
-
-    stream.pos = stream.length
-    previous_element = get_decode_element(stream, reading_size)
-    # if the gif start with clear_code we need continue to the next value
-    if previous_element == clear_code:
-        previous_element = get_decode_element(stream, reading_size)
-
-    decompressed_data.write(index_to_binary(table[previous_element], writing_size))
-    while True:
-        current_element = get_decode_element(stream, reading_size)
-        if current_element == end_of_information_code:
-            break
-        if current_element == clear_code:
-            table = initialize_code_table(color_table_size)
-            reading_size = lzw_minimum_code_size + 1
-            previous_element = get_decode_element(stream, reading_size)
-            decompressed_data.write(index_to_binary(table[previous_element], writing_size))
-
-            continue
-
-        if current_element in table:
-            k = get_first_element(table[current_element])
-            decompressed_data.write(index_to_binary(table[current_element], writing_size))
-        else:
-            k = get_first_element(table[previous_element])
-            decompressed_data.write(index_to_binary(table[previous_element] + "," + k, writing_size))
-
-        table[len(table)] = table[previous_element] + "," + k
-        reading_size = update_reading_size(len(table), reading_size)
-        previous_element = current_element
-
-    return decompressed_data.getvalue(), writing_size
+    reading_size = update_reading_size(len(table), lzw_minimum_code_size + 1)
+    mask = (1 << reading_size) - 1
+
+    decompressed_data = bytearray()
+    previous_element = None
+
+    bit_buffer = 0
+    bits_in_buffer = 0
+    for byte in compressed_data:
+        bit_buffer |= byte << bits_in_buffer
+        bits_in_buffer += BYTE_LEN
+
+        while bits_in_buffer >= reading_size:
+            current_element = bit_buffer & mask
+            bit_buffer >>= reading_size
+            bits_in_buffer -= reading_size
+
+            if current_element == clear_code:
+                table = initialize_code_table(color_table_size)
+                reading_size = update_reading_size(len(table), lzw_minimum_code_size + 1)
+                mask = (1 << reading_size) - 1
+                previous_element = None
+                continue
+
+            if current_element == end_of_information_code:
+                return bytes(decompressed_data)
+
+            # the first code after a clear code is always in the table and adds no new entry
+            if previous_element is None:
+                decompressed_data += table[current_element]
+                previous_element = current_element
+                continue
+
+            previous_value = table[previous_element]
+            if current_element < len(table):
+                current_value = table[current_element]
+                new_value = previous_value + current_value[:1]
+            else:
+                new_value = previous_value + previous_value[:1]
+                current_value = new_value
+            decompressed_data += current_value
+
+            # the table is full, codes are used as is until the next clear code
+            if len(table) < RESET_SIZE:
+                table.append(new_value)
+                reading_size = update_reading_size(len(table), reading_size)
+                mask = (1 << reading_size) - 1
+
+            previous_element = current_element
+
+    return bytes(decompressed_data)
@@ -1,22 +1,5 @@
 import math
 from reader_writer.constants import *
-from bitstring import BitArray, ConstBitStream
-
-
-def initialize_code_table(color_table_size: int) -> dict[str, int]:
-    # init table with dict, clear code and eof
-    return {str(i): i for i in range(color_table_size + EOI_AND_CC)}
-
-
-def prepend_uint_to_bitarray(bit_array: BitArray, value: int, code_size: int):
-    """
-    insert value to bit_array at the start, padding to code size if needed
-    @param bit_array:
-    @param value:
-    @param code_size:
-    @return:
-    """
-    bit_array.prepend(f"uint:{code_size}={value}")
 
 
 def update_writing_size(table_size: int, code_size: int):
@@ -27,105 +10,101 @@ def update_writing_size(table_size: int, code_size: int):
     :param code_size:
     :return: writing_size:
     """
-    if table_size >= int(math.pow(2, code_size)) + 1:
+    if table_size >= (1 << code_size) + 1:
         return code_size + 1
     return code_size
 
 
-def get_next_element(stream: ConstBitStream, reading_size: int):
-    """
-    the next element represent in as string number. the riding size is constant
-    :param stream:
-    :param reading_size:
-    :return: element
-    """
-    element = stream.read(f"uint{reading_size}")
-    return str(element)
-
-
-def lzw_encode(uncompressed_data: BitArray, color_table_size: int):
+def lzw_encode(uncompressed_data: bytes | bytearray | memoryview, color_table_size: int) -> bytes:
     """
     using lzw algorithm for compress data ang gif images
-    the table code look like this:
+    the table code is keyed by integers, a sequence is represented by the code of its prefix and its last index:
 
 
-        ______|______
-      '0'     |  0
-      '1'     |  1
-      '2'     |  2
-      '3'     |  3
+        __________________|______
+      0                   |  0
+      1                   |  1
+      2                   |  2
+      3                   |  3
       ...
-      '0','0',| 298
+      (0 << 8) | 0        | 298
+
+    the codes are packed LSB-first into a preallocated bytearray.
 
-    :param uncompressed_data:
+    :param uncompressed_data: the palette index of every pixel, one byte per pixel
     :param color_table_size:
     :return: compress_data:
     """
-    # change data to be ConstBitStream object for reading
-    # we got  1,1,1,1,1,2,2,.. that represent by '0x2492924.."
-    stream = ConstBitStream(uncompressed_data)
+    if not uncompressed_data:
+        return b''
 
-    # the window size riding is the log of the size table plus 1
+    # the window size is the log of the size table plus 1
     # color table size +1 => it's for the end_of_information_code and clear_code,
-    # (color table size +1) + 1 => it's for situations that the number isn't pow of two then we need added a bit for
-    # riding the numbers (in our example = 3).
-    # notice the reading size in constant - not change
     reading_size = math.ceil(math.log2(color_table_size)) + 1
+    clear_code = color_table_size
+    end_of_information_code = color_table_size + 1
+    first_free_code = color_table_size + EOI_AND_CC
 
-    table = initialize_code_table(color_table_size)
+    table: dict[int, int] = {}
+    next_code = first_free_code
 
     # if the next item in the table will need to be writen with more bit change now the writing size
-    # because we're adding more indexes to the table, and now we need more bits to represent the numbers
-    writing_size = update_writing_size(len(table), reading_size)
+    writing_size = update_writing_size(next_code, reading_size)
 
-    # add the start of reading (in our example = 4)
-    clear_code = table[str(len(table) - EOI_AND_CC)]
-    #  add the enf of reading (in our example = 5)
-    end_of_information_code = table[str(len(table) - 1)]
-    compress_data = BitArray()
-    #  add clear code according the reading size (in our example = 4)
+    # every pixel emits at most two codes (on a table reset), each one at most MAX_WRITING_SIZE bits
+    compress_data = bytearray((2 * len(uncompressed_data) + 3) * MAX_WRITING_SIZE // BYTE_LEN + 2)
+    out_pos = 0
+    bit_buffer = clear_code
+    bits_in_buffer = writing_size
 
-    prepend_uint_to_bitarray(compress_data, clear_code, writing_size)
+    indices = iter(uncompressed_data)
+    previous_element = next(indices)
 
-    length = stream.length
-
-    # the first item
-    previous_element = get_next_element(stream, reading_size)
-
-    while stream.pos != length:
-        # reading the next item
-        current_element = get_next_element(stream, reading_size)
-        previous_and_current = previous_element + "," + current_element
+    for current_element in indices:
+        key = previous_element << BYTE_LEN | current_element
+        code = table.get(key)
 
         # if it is in the table continue
-        if previous_and_current in table:
-            previous_element = previous_and_current
-        elif len(table) == RESET_SIZE:
-            prepend_uint_to_bitarray(compress_data, table[previous_element], MAX_WRITING_SIZE)
-            prepend_uint_to_bitarray(compress_data, clear_code, MAX_WRITING_SIZE)
-            table = initialize_code_table(color_table_size)
-            writing_size = update_writing_size(len(table), reading_size)
-            previous_element = current_element
+        if code is not None:
+            previous_element = code
+            continue
+
+        if next_code == RESET_SIZE:
+            bit_buffer |= (previous_element | clear_code << MAX_WRITING_SIZE) << bits_in_buffer
+            bits_in_buffer += 2 * MAX_WRITING_SIZE
+            table.clear()
+            next_code = first_free_code
+            writing_size = update_writing_size(next_code, reading_size)
         else:
             # add the new concat to the table
-            table[previous_and_current] = len(table)
+            table[key] = next_code
+            next_code += 1
 
             # write the compressed value to the output
-            prepend_uint_to_bitarray(compress_data, table[previous_element], writing_size)
+            bit_buffer |= previous_element << bits_in_buffer
+            bits_in_buffer += writing_size
 
             # checking if to change the writing size
-            writing_size = update_writing_size(len(table), writing_size)
-            previous_element = current_element
+            writing_size = update_writing_size(next_code, writing_size)
+
+        while bits_in_buffer >= BYTE_LEN:
+            compress_data[out_pos] = bit_buffer & BYTE_MAX_NUMBER
+            out_pos += 1
+            bit_buffer >>= BYTE_LEN
+            bits_in_buffer -= BYTE_LEN
 
-    # add the last element to the output
-    prepend_uint_to_bitarray(compress_data, table[previous_element], writing_size)
+        previous_element = current_element
 
-    # add the end to the output - for inform that is the end ot the data
-    prepend_uint_to_bitarray(compress_data, end_of_information_code, writing_size)
+    # add the last element and the end to the output - for inform that is the end ot the data
+    bit_buffer |= (previous_element | end_of_information_code << writing_size) << bits_in_buffer
+    bits_in_buffer += 2 * writing_size
 
-    # fill zeros to be represented by 8 bits and flip the data
-    prepend_uint_to_bitarray(compress_data, ZERO, BYTE_LEN - compress_data.length % BYTE_LEN)
+    # fill zeros to be represented by 8 bits, a full zero byte is added when the codes end on a byte boundary
+    bits_in_buffer += BYTE_LEN - bits_in_buffer % BYTE_LEN
+    while bits_in_buffer > ZERO:
+        compress_data[out_pos] = bit_buffer & BYTE_MAX_NUMBER
+        out_pos += 1
+        bit_buffer >>= BYTE_LEN
+        bits_in_buffer -= BYTE_LEN
 
-    # reversing data (in place)
-    compress_data.byteswap()
-    return compress_data.bytes
+    return bytes(compress_data[:out_pos])
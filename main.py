@@ -1,20 +1,26 @@
 import argparse
 from reader_writer.constants import *
-from reader_writer import read_gif, write_gif
+from reader_writer import read_gif, write_gif, optimize_deltas
 from gif import Gif
 
 
-def main(filename: str, output_path:  str, show_image: bool = False, max_clean: bool = False):
-    with open(filename, "rb") as gif_file:
-        gif: Gif = read_gif(gif_file, True)
-        print("decoded")
+def main(filename: str, output_path:  str, show_image: bool = False, max_clean: bool = False,
+         workers: int | None = None, remux: bool = False, optimize: bool = False,
+         optimize_palettes: bool = False, drop_duplicates: bool = False):
+    gif: Gif = read_gif(filename, True, lazy=True)
+    print("decoded")
 
     if show_image:
         print(f"showing images (first {NUMBER_OF_IMAGE_TO_SHOW})")
         for image in gif.images[:NUMBER_OF_IMAGE_TO_SHOW]:
             image.img.show()
 
-    res = write_gif(gif, max_clean)
+    if optimize:
+        print("optimized" if optimize_deltas(gif) else "not optimized, writing the frames as they are")
+        # the optimized frames keep their encoding, remux writes it without encoding again
+        remux = True
+
+    res = write_gif(gif, max_clean, workers, remux, optimize_palettes, drop_duplicates)
     with open(output_path, "wb") as f:
         res.to_file(f)
     print("saved")
@@ -26,7 +32,14 @@ if __name__ == '__main__':
     parser.add_argument('output_path', type=str, help='Path where the new GIF will be written')
     parser.add_argument('--show_image', action='store_true', help=f'Display {NUMBER_OF_IMAGE_TO_SHOW} images')
     parser.add_argument('--max_clean', action='store_true', help='Perform full cleanup to the GIF')
+    parser.add_argument('--workers', type=int, default=None, help='Number of processes that encode the frames')
+    parser.add_argument('--remux', action='store_true', help='Copy the image data of unchanged frames as is')
+    parser.add_argument('--optimize', action='store_true', help='Write every frame as the pixels that changed')
+    parser.add_argument('--optimize_palettes', action='store_true', help='Trim and share the color tables')
+    parser.add_argument('--drop_duplicates', action='store_true',
+                        help='Drop frames that repeat the frame before them and keep their delay')
     args = parser.parse_args()
 
-    main(args.filename, args.output_path, args.show_image, args.max_clean)
+    main(args.filename, args.output_path, args.show_image, args.max_clean, args.workers, args.remux, args.optimize,
+         args.optimize_palettes, args.drop_duplicates)
 
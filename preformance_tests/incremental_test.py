@@ -0,0 +1,47 @@
+import io
+import time
+import typing
+
+from gif import Frame
+from reader_writer import read_gif, GifParser
+
+CHUNK_SIZE = 64 * 1024
+# the time it takes for a chunk to arrive, about 50 Mbit/s
+CHUNK_DELAY = 0.01
+
+
+def upload(path: str) -> typing.Iterator[bytes]:
+    """the bytes of the gif in chunks that arrive like from the network"""
+    with open(path, "rb") as gif_file:
+        while chunk := gif_file.read(CHUNK_SIZE):
+            time.sleep(CHUNK_DELAY)
+            yield chunk
+
+
+def read_after_upload(path: str) -> tuple[float, float]:
+    """(time to the first frame, total time) when the gif is read once all of it arrived, the frames come together"""
+    start = time.perf_counter()
+    read_gif(io.BytesIO(b''.join(upload(path))), True)
+    total = time.perf_counter() - start
+    return total, total
+
+
+def parse_during_upload(path: str) -> tuple[float, float]:
+    """(time to the first frame, total time) when every chunk is fed to the parser when it arrives"""
+    start = time.perf_counter()
+    first_frame = None
+    parser = GifParser()
+    for chunk in upload(path):
+        blocks = parser.feed(chunk)
+        if first_frame is None and any(isinstance(block, Frame) for block in blocks):
+            first_frame = time.perf_counter() - start
+    parser.close()
+    return first_frame, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    for name in ["giphy13", "giphy19", "giphy15"]:
+        path = f"../Test_gifs/{name}.gif"
+        for function in [read_after_upload, parse_during_upload]:
+            first_frame, total = function(path)
+            print(f"{name} {function.__name__}: first frame {first_frame:.3f}s, total {total:.3f}s")
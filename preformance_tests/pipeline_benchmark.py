@@ -0,0 +1,254 @@
+"""
+Benchmark every stage of reading and writing the test gifs.
+Run it from the root of the repository as a module, so the packages of the repository are importable:
+    python -m preformance_tests.pipeline_benchmark [filenames ...] [--runs N] [--output PATH] [--compare PATH]
+The results are saved as json in preformance_tests/results/ unless --output is given.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import typing
+
+from attrs import define, field, asdict
+
+from BitStream import ByteStreamReader
+from gif import Frame
+from reader_writer import read_gif, write_gif
+from reader_writer.writer import get_color_table, remap_indices
+from lzw import lzw_decode, lzw_encode
+from preformance_tests.reader_backend_test import parse_blocks
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+TEST_GIFS_DIR = os.path.join(BENCHMARK_DIR, "..", "Test_gifs")
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+DEFAULT_RUNS = 5
+# a stage is a regression when its mean time grows by more than this fraction
+REGRESSION_THRESHOLD = 0.1
+MEGABYTE = 1024 * 1024
+
+
+@define
+class StageResult:
+    times: list[float] = field(repr=False)
+    pixels: int = field(repr=False)
+    size: int = field(repr=False)
+    mean: float = field(init=False)
+    stdev: float = field(init=False)
+    best: float = field(init=False)
+    pixels_per_second: float = field(init=False)
+    megabytes_per_second: float = field(init=False)
+
+    def __attrs_post_init__(self):
+        self.mean = statistics.mean(self.times)
+        self.stdev = statistics.stdev(self.times) if len(self.times) > 1 else 0.0
+        self.best = min(self.times)
+        self.pixels_per_second = self.pixels / self.mean if self.mean else 0.0
+        self.megabytes_per_second = self.size / MEGABYTE / self.mean if self.mean else 0.0
+
+
+@define
+class FileBenchmark:
+    filename: str
+    size: int
+    frames: int
+    pixels: int
+    stages: dict[str, StageResult] = field(factory=dict)
+
+
+class GifPipeline:
+    """
+    The inputs of every stage of reading and writing one gif, prepared once, so every stage is timed alone on the
+    output of the stage before it.
+    """
+
+    def __init__(self, gif_data: bytes) -> None:
+        self.gif_data = gif_data
+
+        self.spans = [frame.compressed_data for frame in self.parse_blocks().images]
+        self.compressed = self.assemble_sub_blocks()
+
+        self.frames = [block for block in self.read().structure if isinstance(block, Frame)]
+        self.minimum_code_sizes = [frame.lzw_minimum_code_size for frame in self.frames]
+        self.index_data = self.decode()
+
+        self.gif_object = self.read_decoded()
+        self.color_tables = [get_color_table(self.gif_object, frame) for frame in self.frames]
+        self.mapped = self.map_indices()
+        self.pixels = sum(len(index_data) for index_data in self.index_data)
+
+    def read(self):
+        return read_gif(io.BytesIO(self.gif_data), True, lazy=True)
+
+    def read_decoded(self):
+        """the gif with lazy images and the indices of every frame already decoded"""
+        gif_object = self.read()
+        frames = [block for block in gif_object.structure if isinstance(block, Frame)]
+        for frame, index_data in zip(frames, self.index_data):
+            if frame.decoder is not None:
+                frame.load_index_data(index_data)
+        return gif_object
+
+    def parse_blocks(self):
+        """walk all the blocks and only locate the image data sub blocks"""
+        return parse_blocks(ByteStreamReader(self.gif_data), lambda gif_stream: gif_stream.read_sub_block_spans())
+
+    def assemble_sub_blocks(self) -> list[bytes]:
+        gif_stream = ByteStreamReader(self.gif_data)
+        return [gif_stream.join_spans(spans) for spans in self.spans]
+
+    def decode(self) -> list[bytes]:
+        return [lzw_decode(compressed, minimum_code_size) if compressed else b''
+                for compressed, minimum_code_size in zip(self.compressed, self.minimum_code_sizes)]
+
+    @staticmethod
+    def composite(gif_object) -> None:
+        for image in gif_object.images:
+            image.composite()
+
+    def map_indices(self) -> list[bytes]:
+        return [remap_indices(index_data, frame.color_table, color_table) if frame.color_table is not None else b''
+                for index_data, frame, color_table in zip(self.index_data, self.frames, self.color_tables)]
+
+    def encode(self) -> list[bytes]:
+        return [lzw_encode(mapped, len(color_table)) for mapped, color_table in zip(self.mapped, self.color_tables)]
+
+    @staticmethod
+    def serialize(gif_object) -> bytes:
+        # no frame changed, so remux writes the blocks without encoding the images
+        gif_file = io.BytesIO()
+        write_gif(gif_object, False, remux=True).to_file(gif_file)
+        return gif_file.getvalue()
+
+    def stages(self) -> dict[str, tuple[typing.Callable[[], typing.Any], typing.Callable[..., typing.Any]]]:
+        """every stage as (setup, run), only run is timed and it gets the output of setup"""
+        return {
+            "block_parsing": (lambda: (), self.parse_blocks),
+            "sub_block_assembly": (lambda: (), self.assemble_sub_blocks),
+            "lzw_decode": (lambda: (), self.decode),
+            "compositing": (lambda: (self.read_decoded(),), self.composite),
+            "index_mapping": (lambda: (), self.map_indices),
+            "lzw_encode": (lambda: (), self.encode),
+            "serialization": (lambda: (self.read(),), self.serialize),
+        }
+
+
+def time_stage(setup: typing.Callable[[], typing.Any], run: typing.Callable[..., typing.Any], runs: int) -> list[float]:
+    times = []
+    for _ in range(runs):
+        args = setup()
+        start = time.perf_counter()
+        run(*args)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def benchmark_file(path: str, runs: int) -> FileBenchmark:
+    with open(path, "rb") as gif_file:
+        gif_data = gif_file.read()
+
+    pipeline = GifPipeline(gif_data)
+    result = FileBenchmark(os.path.basename(path), len(gif_data), len(pipeline.frames), pipeline.pixels)
+    for stage, (setup, run) in pipeline.stages().items():
+        result.stages[stage] = StageResult(time_stage(setup, run, runs), pipeline.pixels, len(gif_data))
+    return result
+
+
+def total_stages(results: list[FileBenchmark]) -> dict[str, StageResult]:
+    """the stages over all the files, the time of every run is summed over the files"""
+    if not results:
+        return {}
+    pixels = sum(result.pixels for result in results)
+    size = sum(result.size for result in results)
+    return {stage: StageResult([sum(times) for times in zip(*(result.stages[stage].times for result in results))],
+                               pixels, size)
+            for stage in results[0].stages}
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=BENCHMARK_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_stages(title: str, stages: dict[str, StageResult]) -> None:
+    print(title)
+    for stage, result in stages.items():
+        print(f"  {stage:<20} {result.mean * 1000:10.2f} ms ± {result.stdev * 1000:7.2f}  "
+              f"{result.pixels_per_second / 1e6:9.2f} Mpixels/s  {result.megabytes_per_second:9.2f} MB/s")
+
+
+def compare(results: dict, previous_path: str) -> list[str]:
+    """
+    the stages whose time over all the files grew by more than REGRESSION_THRESHOLD, both on the best run and by more
+    than the run to run deviation of the two results, so noise is not reported
+    """
+    with open(previous_path) as previous_file:
+        previous = json.load(previous_file)
+
+    regressions = []
+    for stage, result in results["total"].items():
+        if (previous_result := previous["total"].get(stage)) is None:
+            continue
+        change = result["mean"] / previous_result["mean"] - 1
+        best_change = result["best"] / previous_result["best"] - 1
+        noise = result["stdev"] + previous_result["stdev"]
+        if change > REGRESSION_THRESHOLD and best_change > REGRESSION_THRESHOLD and \
+                result["mean"] - previous_result["mean"] > noise:
+            regressions.append(f"{stage}: {previous_result['mean'] * 1000:.2f} ms -> {result['mean'] * 1000:.2f} ms "
+                               f"({change:+.0%})")
+    return regressions
+
+
+def main(filenames: list[str] | None, runs: int, output: str | None, previous: str | None) -> dict:
+    filenames = filenames or sorted(filename for filename in os.listdir(TEST_GIFS_DIR) if filename.endswith(".gif"))
+
+    results = []
+    for filename in filenames:
+        result = benchmark_file(os.path.join(TEST_GIFS_DIR, filename), runs)
+        print_stages(f"{result.filename} ({result.frames} frames, {result.size / MEGABYTE:.2f} MB)", result.stages)
+        results.append(result)
+
+    total = total_stages(results)
+    print_stages(f"total ({len(results)} files, {runs} runs)", total)
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "runs": runs,
+        "total": {stage: asdict(result) for stage, result in total.items()},
+        "files": [asdict(result) for result in results],
+    }
+
+    output = output or os.path.join(RESULTS_DIR, f"benchmark-{report['commit'] or int(time.time())}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"saved results to {output}")
+
+    if previous is not None:
+        regressions = compare(report, previous)
+        print("regressions:" if regressions else "no regressions")
+        for regression in regressions:
+            print(f"  {regression}")
+
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark every stage of reading and writing the test GIFs. '
+                                                 'Run from the repository root: '
+                                                 'python -m preformance_tests.pipeline_benchmark')
+    parser.add_argument('filenames', nargs='*', help='GIFs in Test_gifs to run (default: all of them)')
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help='Times every stage runs on every GIF')
+    parser.add_argument('--output', type=str, default=None, help='Path of the json results')
+    parser.add_argument('--compare', type=str, default=None, help='Json results of an earlier run to compare to')
+    args = parser.parse_args()
+
+    main(args.filenames, args.runs, args.output, args.compare)
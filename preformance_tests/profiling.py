@@ -5,16 +5,22 @@ from typing import Callable, Literal
 
 import main
 
+NUMBER_OF_FUNCTIONS_TO_PRINT = 20
 
-def profile(tool: Literal['snakeviz', 'tuna'], function: Callable, *args, **kwargs):
+
+def profile(tool: Literal['snakeviz', 'tuna'] | None, function: Callable, *args, **kwargs):
+    """profile the function and open the result with tool, or print the slowest functions when tool is None"""
     with cProfile.Profile() as pr:
         function(*args, **kwargs)
 
     stats = pstats.Stats(pr)
     stats.sort_stats(pstats.SortKey.TIME)
     stats.dump_stats(filename='profiling.prof')
-    subprocess.run([tool, 'profiling.prof'])
+    if tool is None:
+        stats.print_stats(NUMBER_OF_FUNCTIONS_TO_PRINT)
+    else:
+        subprocess.run([tool, 'profiling.prof'])
 
 
 if __name__ == '__main__':
-    profile('tuna', main.main, "../gif_tests/giphy.gif", show_image=False)
+    profile(None, main.main, "../Test_gifs/giphy.gif", "profiling.gif", show_image=False)
@@ -0,0 +1,64 @@
+from typing import Callable
+
+import bitstring
+
+from BitStream import BitStreamReader, ByteStreamReader
+from gif import Gif
+import preformance_tests.time_test as time_test
+from reader_writer.block_prefix import BlockPrefix
+from reader_writer.constants import *
+from reader_writer.reader import decode_header, decode_logical_screen_descriptor, decode_global_color_table, \
+    decode_application_extension, decode_graphic_control_extension, decode_comment_extension, decode_plain_text, \
+    decode_image_descriptor, decode_local_color_table, read_sub_blocks
+
+
+def parse_blocks(gif_stream: BitStreamReader | ByteStreamReader,
+                 read_image_data: Callable[[BitStreamReader | ByteStreamReader], bytes] = read_sub_blocks) -> Gif:
+    """
+    walk all the blocks of the gif like read_gif does, the image data sub blocks are read with read_image_data but
+    not lzw decoded, so the time is spent only in the reader backend.
+    """
+    gif_object = Gif()
+    decode_header(gif_stream, gif_object)
+    decode_logical_screen_descriptor(gif_stream, gif_object)
+    if gif_object.global_color_table_size > MIN_TABLE_SIZE:
+        decode_global_color_table(gif_stream, gif_object)
+
+    while (prefix := BlockPrefix(gif_stream.read_bytes(BLOCK_PREFIX_LEN_BYTE))) != BlockPrefix.Trailer:
+        if prefix is BlockPrefix.Extension:
+            prefix = BlockPrefix(gif_stream.read_bytes(BLOCK_PREFIX_LEN_BYTE))
+            if prefix is BlockPrefix.ApplicationExtension:
+                decode_application_extension(gif_stream, gif_object)
+            elif prefix is BlockPrefix.GraphicControlExtension:
+                decode_graphic_control_extension(gif_stream, gif_object)
+            elif prefix is BlockPrefix.CommentExtension:
+                decode_comment_extension(gif_stream, gif_object)
+            elif prefix is BlockPrefix.PlainTextExtension:
+                decode_plain_text(gif_stream, gif_object)
+
+        elif prefix is BlockPrefix.ImageDescriptor:
+            decode_image_descriptor(gif_stream, gif_object)
+            if gif_object.images[LAST_ELEMENT].local_color_table_flag:
+                decode_local_color_table(gif_stream, gif_object)
+
+            gif_object.images[LAST_ELEMENT].lzw_minimum_code_size = gif_stream.read_unsigned_integer(
+                LZW_MINIMUM_CODE_SIZE_LEN_BYTE, 'bytes')
+            gif_object.images[LAST_ELEMENT].compressed_data = read_image_data(gif_stream)
+
+    return gif_object
+
+
+def parse_with_bitstring(data: bytes) -> Gif:
+    return parse_blocks(BitStreamReader(bitstring.ConstBitStream(data)))
+
+
+def parse_with_bytes(data: bytes) -> Gif:
+    return parse_blocks(ByteStreamReader(data))
+
+
+if __name__ == '__main__':
+    for name in ["giphy13", "giphy19", "giphy15"]:
+        with open(f"../Test_gifs/{name}.gif", "rb") as gif_file:
+            gif_data = gif_file.read()
+        print(name)
+        time_test.test_functions(10, [parse_with_bitstring, parse_with_bytes], gif_data)
@@ -0,0 +1,19 @@
+from gif import Frame
+import preformance_tests.time_test as time_test
+from reader_writer import read_gif, scan_gif
+
+
+def read_structure(path: str) -> list[tuple[int, int, int, int]]:
+    gif = read_gif(path, False, lazy=True)
+    return [(image.left, image.top, image.width, image.height) for image in gif.structure
+            if isinstance(image, Frame)]
+
+
+def scan_structure(path: str) -> list[tuple[int, int, int, int]]:
+    return [(frame.left, frame.top, frame.width, frame.height) for frame in scan_gif(path).frames]
+
+
+if __name__ == '__main__':
+    for name in ["giphy13", "giphy19", "giphy15"]:
+        print(name)
+        time_test.test_functions(10, [read_structure, scan_structure], f"../Test_gifs/{name}.gif")
@@ -0,0 +1,29 @@
+from BitStream import ByteStreamReader
+from gif import Gif
+from preformance_tests.reader_backend_test import parse_blocks
+import preformance_tests.time_test as time_test
+from reader_writer.constants import *
+
+
+def concat_sub_blocks(gif_stream: ByteStreamReader) -> bytes:
+    """the old way, every sub block is appended to the data read so far"""
+    data = b''
+    while (sub_block_size := gif_stream.read_unsigned_integer(BLOCK_SIZE_LEN_BYTE, 'bytes')) != END_OF_DATA:
+        data += gif_stream.read_bytes(sub_block_size)
+    return data
+
+
+def parse_with_concat(data: bytes) -> Gif:
+    return parse_blocks(ByteStreamReader(data), concat_sub_blocks)
+
+
+def parse_with_spans(data: bytes) -> Gif:
+    return parse_blocks(ByteStreamReader(data))
+
+
+if __name__ == '__main__':
+    for name in ["giphy13", "giphy19", "giphy15"]:
+        with open(f"../Test_gifs/{name}.gif", "rb") as gif_file:
+            gif_data = gif_file.read()
+        print(name)
+        time_test.test_functions(10, [parse_with_concat, parse_with_spans], gif_data)
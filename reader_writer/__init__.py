@@ -1,7 +1,21 @@
-from .writer import write_gif
-from .reader import read_gif
+from .writer import write_gif, GifStreamWriter
+from .reader import read_gif, iter_frames
+from .scanner import scan_gif, GifIndex
+from .random_access import get_frame, index_gif
+from .frame_cache import FrameCache
+from .optimizer import optimize_deltas
+from .incremental_reader import GifParser
 
 __all__ = [
     "write_gif",
-    "read_gif"
+    "GifStreamWriter",
+    "read_gif",
+    "iter_frames",
+    "scan_gif",
+    "GifIndex",
+    "get_frame",
+    "index_gif",
+    "FrameCache",
+    "optimize_deltas",
+    "GifParser"
 ]
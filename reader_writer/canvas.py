@@ -0,0 +1,134 @@
+from reader_writer.constants import *
+
+from gif import *
+
+
+def palette_to_rgb(index_data: bytes, color_table: list[bytes]) -> bytearray:
+    """
+    Map palette indices to packed RGB, with one bytes.translate per color channel over the whole buffer.
+    Indices outside the color table are mapped to black.
+    """
+    palette = b''.join(color_table).ljust(PALETTE_SIZE * RGB_LEN_BYTE, b'\x00')
+    rgb = bytearray(len(index_data) * RGB_LEN_BYTE)
+    for channel in range(RGB_LEN_BYTE):
+        rgb[channel::RGB_LEN_BYTE] = index_data.translate(palette[channel::RGB_LEN_BYTE])
+    return rgb
+
+
+class Canvas:
+    """
+    The logical screen of a gif: one RGB buffer that all the frames are drawn on in place, in order.
+    Drawing a frame only touches its own rectangle. The disposal of a frame is applied to its rectangle when the next
+    frame is drawn: disposal 2 fills it with the background color, and disposal 3 puts back the rows that were under
+    the frame, which are the only pixels saved.
+    """
+
+    def __init__(self, gif_object: Gif) -> None:
+        self.width = gif_object.width
+        self.height = gif_object.height
+        self._background_color_index = gif_object.background_color_index
+        self._global_color_table = gif_object.global_color_table
+        self.pixels: bytearray | None = None
+
+        # the last frame drawn and its disposal, applied before the next frame is drawn
+        self._last_frame: Frame | None = None
+        self._last_disposal: int | None = None
+        self._saved_rows: list[bytes] | None = None
+
+    def background_color(self, color_table: list[bytes] | None) -> bytes:
+        if color_table is not None and self._background_color_index < len(color_table):
+            return color_table[self._background_color_index]
+        return bytes(RGB_LEN_BYTE)
+
+    def fill(self, color: bytes) -> None:
+        self.pixels = bytearray(color * self.width * self.height)
+
+    def fill_background(self) -> None:
+        """fill the canvas like after a frame that covers all of it is disposed to the background"""
+        self.fill(self.background_color(self._global_color_table))
+
+    def rows(self, image: Frame) -> list[tuple[int, int, int]]:
+        """
+        (start in the frame, start in the canvas, length) in bytes of every row of the frame that is on the canvas.
+        the parts of the frame outside the logical screen are dropped, and a frame as wide as the canvas is one row.
+        """
+        visible_width = max(min(image.width, self.width - image.left), 0)
+        visible_height = max(min(image.height, self.height - image.top), 0)
+        if not visible_width or not visible_height:
+            return []
+
+        frame_row_length = image.width * RGB_LEN_BYTE
+        canvas_row_length = self.width * RGB_LEN_BYTE
+        if image.left == 0 and visible_width == image.width == self.width:
+            return [(0, image.top * canvas_row_length, visible_height * frame_row_length)]
+        return [(row * frame_row_length, (row + image.top) * canvas_row_length + image.left * RGB_LEN_BYTE,
+                 visible_width * RGB_LEN_BYTE) for row in range(visible_height)]
+
+    def draw(self, image: Frame, disposal: int | None) -> None:
+        """draw the pixels of the frame, transparent pixels keep the color that is already on the canvas"""
+        self._start_frame(image, disposal)
+        if image.index_data:
+            self.paint(image)
+
+    def load(self, image: Frame, disposal: int | None, pixels: bytes) -> None:
+        """set the canvas after the frame to pixels, that were drawn before (cached)"""
+        self._start_frame(image, disposal)
+        self.pixels[:] = pixels
+
+    def snapshot(self) -> bytearray:
+        return bytearray(self.pixels)
+
+    def dispose(self) -> None:
+        """apply the disposal of the last frame drawn to its rectangle"""
+        image, disposal, saved_rows = self._last_frame, self._last_disposal, self._saved_rows
+        self._last_frame = self._last_disposal = self._saved_rows = None
+        if image is None:
+            return
+
+        if disposal == DISPOSAL_OPTION_TWO:
+            background_color = self.background_color(self._global_color_table)
+            for _, canvas_start, length in self.rows(image):
+                self.pixels[canvas_start: canvas_start + length] = background_color * (length // RGB_LEN_BYTE)
+        elif disposal == DISPOSAL_OPTION_THREE:
+            for (_, canvas_start, length), saved_row in zip(self.rows(image), saved_rows):
+                self.pixels[canvas_start: canvas_start + length] = saved_row
+
+    def _start_frame(self, image: Frame, disposal: int | None) -> None:
+        self.dispose()
+        if self.pixels is None:
+            self.fill(self.background_color(image.color_table))
+
+        if disposal == DISPOSAL_OPTION_THREE:
+            self._saved_rows = [bytes(self.pixels[canvas_start: canvas_start + length])
+                                for _, canvas_start, length in self.rows(image)]
+        self._last_frame = image
+        self._last_disposal = disposal
+
+    def paint(self, image: Frame) -> None:
+        rows = self.rows(image)
+        if not rows:
+            return
+
+        frame_rgb = palette_to_rgb(image.index_data, image.color_table)
+
+        transparent_index = image.transparent_index
+        if transparent_index is not None and transparent_index in image.index_data:
+            # 0xFF on every byte of a transparent pixel, 0 on the rest
+            mask = image.index_data.translate(bytes(BYTE_MAX_NUMBER if index == transparent_index else 0
+                                                    for index in range(PALETTE_SIZE)))
+            keep_mask = bytearray(len(frame_rgb))
+            for channel in range(RGB_LEN_BYTE):
+                keep_mask[channel::RGB_LEN_BYTE] = mask
+        else:
+            keep_mask = None
+
+        canvas = self.pixels
+        for frame_start, canvas_start, length in rows:
+            new_pixels = frame_rgb[frame_start: frame_start + length]
+            if keep_mask is not None and (keep := keep_mask[frame_start: frame_start + length]).count(0) != length:
+                # take the canvas bytes under the mask and the frame bytes everywhere else
+                keep_bits = int.from_bytes(keep, 'big')
+                old_bits = int.from_bytes(canvas[canvas_start: canvas_start + length], 'big')
+                new_bits = int.from_bytes(new_pixels, 'big')
+                new_pixels = ((new_bits & ~keep_bits) | (old_bits & keep_bits)).to_bytes(length, 'big')
+            canvas[canvas_start: canvas_start + length] = new_pixels
@@ -16,10 +16,6 @@ GIF_PIXEL_RATIO_VALUE_LEN_BYTE = 1
 NORMALIZED_VALUE = 64
 WIDER_RANGE_RATIO = 15
 
-# insert_background_frame
-DEFAULT_RESERVED_SIZE = 0
-DEFAULT_LOCAL_COLOR_TABLE_SIZE = 0
-
 # decode_application_extension and write_application_extension
 APPLICATION_EXTENSION_BLOCK_SIZE_LEN_BYTE = 1
 APPLICATION_NAME_LEN_BYTE = 8
@@ -30,6 +26,7 @@ GRAPHIC_CONTROL_EXTENSION_BLOCK_SIZE_LEN_BYTE = 1
 RESERVED_LEN_BIT = 3
 DISPOSAL_LEN_BIT = 3
 DELAY_TIME_LEN_BYTE = 2
+MAX_DELAY_TIME = 65535
 TRANSPARENT_INDEX_LEN_BYTE = 1
 TRANSPARENT_COLOR_FLAG_LEN_BIT = 1
 BLOCK_TERMINATOR_LEN_BYTE = 1
@@ -65,14 +62,35 @@ PLAIN_TEXT_BACKGROUND_COLOR_LEN_BYTE = 1
 # read_gif and write_gif
 BLOCK_PREFIX_LEN_BYTE = 1
 
+# scan_gif
+LOOPING_APPLICATIONS = ("NETSCAPE2.0", "ANIMEXTS1.0")
+LOOP_SUB_BLOCK_ID = 1
+LOOP_COUNT_LEN_BYTE = 2
+
+# GifParser, the sizes of the blocks before their sub blocks
+LOGICAL_SCREEN_DESCRIPTOR_LEN_BYTE = 7
+SCREEN_PACKED_FIELDS_OFFSET = 4
+IMAGE_DESCRIPTOR_LEN_BYTE = 10
+IMAGE_PACKED_FIELDS_OFFSET = 9
+EXTENSION_HEADER_LEN_BYTE = 2
+COLOR_TABLE_FLAG_MASK = 0x80
+COLOR_TABLE_SIZE_MASK = 0x07
+
 # create image
-HEX_SIZE = 16
-R_START = 1
-R_END = G_START = 3
-G_END = B_START = 5
-B_END = 7
+PALETTE_SIZE = 256
+
+# frame cache
+CACHE_KEY_SIZE = 16
+CACHE_SUFFIX = ".frame"
+DEFAULT_CACHE_MEMORY = 256 * 1024 * 1024
+DEFAULT_CACHE_DISK = 1024 * 1024 * 1024
+
+# optimize_deltas and optimize_color_tables
+# the smallest color table written, smaller ones would give an lzw minimum code size below MINIMUM_LZW_CS
+MIN_COLOR_TABLE_SIZE = 4
 
 # general
+DISPOSAL_OPTION_ONE = 1
 DISPOSAL_OPTION_TWO = 2
 DISPOSAL_OPTION_THREE = 3
 PENULTIMATE = -2
@@ -83,7 +101,6 @@ PLAIN_TEXT_EXTENSION_BLOCK_SIZE = 4
 END_OF_DATA = 0
 BLOCK_SIZE_LEN_BYTE = 1
 RGB_LEN_BYTE = 3
-TRANSPARENT_VALUE = -1
 MIN_TABLE_SIZE = 0
 BYTE_MAX_NUMBER = 255
 
@@ -93,7 +110,6 @@ MAX_WRITING_SIZE = 12
 BYTE_LEN = 8
 ZERO = 0
 EOI_AND_CC = 2
-BINARY_HEADER_LEN = 2
 
 """
 main constants
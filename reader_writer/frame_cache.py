@@ -0,0 +1,136 @@
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+
+from attrs import define
+
+from reader_writer.constants import *
+
+
+@define
+class CacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    disk_evictions: int = 0
+
+
+def cache_key(*parts: bytes | memoryview) -> str:
+    """content address of the parts, the same data always gives the same key"""
+    digest = hashlib.blake2b(digest_size=CACHE_KEY_SIZE)
+    for part in parts:
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class FrameCache:
+    """
+    Cache of decoded frames (palette indices and composited canvases) keyed by the hash of the data they come from.
+    The memory tier is bounded by max_memory bytes. When directory is given, every entry is also written there and
+    the files are bounded by max_disk bytes. Both tiers evict the least recently used entries first.
+    """
+
+    def __init__(self, max_memory: int = DEFAULT_CACHE_MEMORY, directory: str | os.PathLike | None = None,
+                 max_disk: int = DEFAULT_CACHE_DISK):
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        self.directory = directory
+        self.stats = CacheStats()
+
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_size = 0
+        # the size of every file on disk, the least recently used first
+        self._disk: OrderedDict[str, int] = OrderedDict()
+        self._disk_size = 0
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            entries = [(entry.stat(), entry.name) for entry in os.scandir(directory)
+                       if entry.is_file() and entry.name.endswith(CACHE_SUFFIX)]
+            for entry_stat, name in sorted(entries, key=lambda entry: entry[0].st_mtime_ns):
+                self._disk[name.removesuffix(CACHE_SUFFIX)] = entry_stat.st_size
+                self._disk_size += entry_stat.st_size
+            self._evict_disk()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._memory or key in self._disk
+
+    def get(self, key: str) -> bytes | None:
+        value = self._memory.get(key)
+        if value is not None:
+            self._memory.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+        if key in self._disk:
+            try:
+                with open(self._path(key), "rb") as cache_file:
+                    value = cache_file.read()
+                os.utime(self._path(key))
+            except FileNotFoundError:
+                # removed by another process sharing the directory (before it was read or touched)
+                self._disk_size -= self._disk.pop(key)
+            else:
+                self._disk.move_to_end(key)
+                self.stats.disk_hits += 1
+                self._put_memory(key, value)
+                return value
+
+        self.stats.misses += 1
+        return None
+
+    def put(self, key: str, value: bytes) -> None:
+        value = bytes(value)
+        self._put_memory(key, value)
+        if self.directory is not None and key not in self._disk:
+            self._put_disk(key, value)
+
+    def clear(self) -> None:
+        """drop the memory tier, the files on disk are kept"""
+        self._memory.clear()
+        self._memory_size = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    def _put_memory(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_memory:
+            return
+        if key in self._memory:
+            self._memory_size -= len(self._memory.pop(key))
+
+        self._memory[key] = value
+        self._memory_size += len(value)
+        while self._memory_size > self.max_memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+            self.stats.evictions += 1
+
+    def _put_disk(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_disk:
+            return
+
+        # write to a temporary file and rename it, so readers never see half an entry
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as temp_file:
+            temp_file.write(value)
+        os.replace(temp_path, self._path(key))
+
+        self._disk[key] = len(value)
+        self._disk_size += len(value)
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        while self._disk_size > self.max_disk:
+            evicted_key, evicted_size = self._disk.popitem(last=False)
+            self._disk_size -= evicted_size
+            self.stats.disk_evictions += 1
+            try:
+                os.unlink(self._path(evicted_key))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,138 @@
+from BitStream import ByteStreamReader
+from reader_writer.constants import *
+
+from gif import *
+from .block_prefix import BlockPrefix
+from .canvas import Canvas
+from .frame_cache import FrameCache
+from .reader import decode_header, decode_logical_screen_descriptor, decode_global_color_table, decode_block
+
+GifBlock = Frame | ApplicationExtension | CommentExtension | GraphicControlExtension | PlainTextExtension
+
+
+def color_table_len(packed_fields: int) -> int:
+    """the size in bytes of the color table from the packed fields of its descriptor"""
+    if not packed_fields & COLOR_TABLE_FLAG_MASK:
+        return 0
+    return pow(2, (packed_fields & COLOR_TABLE_SIZE_MASK) + 1) * RGB_LEN_BYTE
+
+
+class GifParser:
+    """
+    Read a gif from chunks of bytes of any size, as they arrive.
+    feed decodes every block the chunk completes and returns the frames and extensions it decoded, so the frames are
+    decoded (and composited, with create_images) while the rest of the gif is still coming. The blocks are kept in
+    gif_object like read_gif does, and close checks that the gif is complete and returns it.
+    Only the bytes of the block that is not complete yet are buffered.
+    """
+
+    def __init__(self, create_images: bool = True, lazy: bool = False, cache: FrameCache | None = None) -> None:
+        self.gif_object = Gif()
+        self._create_images = create_images
+        self._lazy = lazy
+        self._cache = cache
+        self._canvas: Canvas | None = None
+
+        self._buffer = bytearray()
+        # how far the sub blocks of the block at the start of the buffer were scanned, so they are not scanned again
+        self._scanned: int | None = None
+        self._trailer_read = False
+        self._closed = False
+
+    def feed(self, chunk: bytes | bytearray | memoryview) -> list[GifBlock]:
+        """add the next bytes of the gif, the blocks they complete are decoded and returned in order"""
+        if self._closed:
+            raise ValueError("feed to a closed GifParser")
+        if self._trailer_read:
+            # like read_gif, whatever is after the trailer is not read
+            return []
+
+        self._buffer += chunk
+        blocks = []
+        start = 0
+        while not self._trailer_read and (end := self._block_end(start)) is not None:
+            blocks.extend(self._decode(start, end))
+            self._scanned = None
+            start = end
+
+        del self._buffer[:start]
+        return blocks
+
+    def close(self) -> Gif:
+        """the end of the gif, IncorrectFileFormat is raised when it ended before its trailer"""
+        self._closed = True
+        self._buffer.clear()
+        if not self._trailer_read:
+            raise IncorrectFileFormat("the gif ended before its trailer")
+        return self.gif_object
+
+    def _block_end(self, start: int) -> int | None:
+        """the end of the block that starts at start in the buffer, None when the buffer does not have all of it"""
+        buffer = self._buffer
+        available = len(buffer) - start
+
+        if self.gif_object.version is None:
+            return start + VERSION_LEN_BYTE if available >= VERSION_LEN_BYTE else None
+
+        if self.gif_object.width is None:
+            # the logical screen descriptor and the global color table
+            if available < LOGICAL_SCREEN_DESCRIPTOR_LEN_BYTE:
+                return None
+            size = LOGICAL_SCREEN_DESCRIPTOR_LEN_BYTE + color_table_len(buffer[start + SCREEN_PACKED_FIELDS_OFFSET])
+            return start + size if available >= size else None
+
+        if not available:
+            return None
+
+        prefix = BlockPrefix(bytes(buffer[start: start + BLOCK_PREFIX_LEN_BYTE]))
+        if prefix is BlockPrefix.Trailer or prefix is BlockPrefix.Terminator:
+            return start + BLOCK_PREFIX_LEN_BYTE
+
+        if prefix is BlockPrefix.Extension:
+            return self._sub_blocks_end(start, start + EXTENSION_HEADER_LEN_BYTE)
+
+        if prefix is BlockPrefix.ImageDescriptor:
+            if available < IMAGE_DESCRIPTOR_LEN_BYTE:
+                return None
+            sub_blocks_start = (start + IMAGE_DESCRIPTOR_LEN_BYTE +
+                                color_table_len(buffer[start + IMAGE_PACKED_FIELDS_OFFSET]) +
+                                LZW_MINIMUM_CODE_SIZE_LEN_BYTE)
+            return self._sub_blocks_end(start, sub_blocks_start)
+
+        raise IncorrectFileFormat("prefix is incorrect")
+
+    def _sub_blocks_end(self, start: int, sub_blocks_start: int) -> int | None:
+        """the end of the block terminator after the sub blocks, None when the buffer does not have it yet"""
+        buffer = self._buffer
+        position = start + self._scanned if self._scanned is not None else sub_blocks_start
+        while position < len(buffer):
+            sub_block_size = buffer[position]
+            if sub_block_size == END_OF_DATA:
+                return position + BLOCK_SIZE_LEN_BYTE
+            position += BLOCK_SIZE_LEN_BYTE + sub_block_size
+
+        self._scanned = position - start
+        return None
+
+    def _decode(self, start: int, end: int) -> list[GifBlock]:
+        gif_object = self.gif_object
+        gif_stream = ByteStreamReader(memoryview(self._buffer)[start:end])
+        try:
+            if gif_object.version is None:
+                decode_header(gif_stream, gif_object)
+                return []
+
+            if gif_object.width is None:
+                decode_logical_screen_descriptor(gif_stream, gif_object)
+                # There is no global color table if the size is 0.
+                if gif_object.global_color_table_size > MIN_TABLE_SIZE:
+                    decode_global_color_table(gif_stream, gif_object)
+                self._canvas = Canvas(gif_object) if self._create_images else None
+                return []
+
+            structure_size = len(gif_object.structure)
+            if decode_block(gif_stream, gif_object, self._canvas, self._lazy, self._cache) is BlockPrefix.Trailer:
+                self._trailer_read = True
+            return gif_object.structure[structure_size:]
+        finally:
+            gif_stream.release()
@@ -0,0 +1,216 @@
+import math
+
+from attrs import define
+
+from reader_writer.constants import *
+from gif import *
+from lzw import lzw_encode
+from .canvas import Canvas
+from .writer import color_index_map, get_color_table, encode_image, pad_color_table, unused_color, \
+    frame_graphic_controls, add_graphic_control_extension
+
+
+@define
+class FrameDelta:
+    # the rectangle of the canvas that changed since the frame before
+    left: int
+    top: int
+    width: int
+    height: int
+    index_data: bytes
+    color_table: list[bytes]
+    # True when color_table is a new local color table of the frame, False when the frame keeps its own table
+    new_color_table: bool
+    # the index of the pixels that did not change, None when every pixel keeps its color
+    transparent_index: int | None
+    # the lzw encoded index_data
+    encoded: bytes
+
+
+def optimize_deltas(gif_object: Gif) -> bool:
+    """
+    Rewrite every frame after the first as only the pixels that changed since the frame before.
+    Every frame is cropped to the bounding box of the pixels that differ between its canvas and the canvas of the
+    frame before, and the pixels inside the box that did not change get a transparent index (so the lzw runs are
+    longer). Every frame is set to disposal 1 (a frame with no graphic control extension has no disposal already), so
+    each frame is drawn on the canvas of the frame before and the decoded canvases stay the same.
+    The crop is encoded with and without the transparent pixels, and a frame that already draws only on top of the
+    frame before is also kept as it is, the smallest of them is used. Its encoding is kept as the image data of the
+    frame, so writing in remux mode does not encode it again.
+    The gif must be read with create_images, the canvases are taken from the image data of the frames.
+    :return: False when the gif is left unchanged, because the frames would not get smaller or a frame can not be
+             written as a change of the frame before with one color table of up to 256 colors
+    """
+    frames = [block for block in gif_object.structure if isinstance(block, Frame)]
+    if any(frame.image_data is None for frame in frames):
+        raise ValueError("the canvases of the frames are needed, read the gif with create_images")
+
+    deltas = [None]
+    original_size = optimized_size = 0
+    for previous_frame, frame in zip(frames, frames[1:]):
+        delta = frame_delta(gif_object, frame, previous_frame.image_data, frame.image_data)
+        if delta is None:
+            return False
+
+        size = len(original_encoding(gif_object, frame))
+        original_size += size
+        if size <= len(delta.encoded) and redraws_canvas(gif_object, frame, previous_frame.image_data,
+                                                         frame.image_data):
+            delta = None
+        optimized_size += size if delta is None else len(delta.encoded)
+        deltas.append(delta)
+
+    if optimized_size >= original_size:
+        return False
+
+    graphic_controls = frame_graphic_controls(gif_object)
+    for frame, delta in zip(frames, deltas):
+        graphic_control_ex = graphic_controls.get(id(frame))
+        if graphic_control_ex is None and delta is not None and delta.transparent_index is not None:
+            # the transparent index of the delta needs a graphic control extension
+            graphic_control_ex = add_graphic_control_extension(gif_object, frame)
+        if delta is not None:
+            apply_delta(frame, graphic_control_ex, delta)
+        if graphic_control_ex is not None:
+            graphic_control_ex.disposal = DISPOSAL_OPTION_ONE
+    return True
+
+
+def redraws_canvas(gif_object: Gif, image: Frame, previous_canvas: bytes, canvas: bytes) -> bool:
+    """drawing the frame as it is on previous_canvas, with no disposal before it, gives canvas"""
+    if image.color_table is None:
+        return previous_canvas == canvas
+    frame_canvas = Canvas(gif_object)
+    frame_canvas.pixels = bytearray(previous_canvas)
+    frame_canvas.paint(image)
+    return frame_canvas.pixels == canvas
+
+
+def original_encoding(gif_object: Gif, image: Frame) -> bytes:
+    color_table = get_color_table(gif_object, image)
+    if image.is_unchanged(color_table):
+        return image.compressed_data
+    return encode_image(image, color_table)
+
+
+def apply_delta(image: Frame, graphic_control_ex: GraphicControlExtension | None, delta: FrameDelta) -> None:
+    image.left, image.top, image.width, image.height = delta.left, delta.top, delta.width, delta.height
+    image.interlace_flag = False
+    if delta.new_color_table:
+        image.local_color_table_flag = True
+        image.local_color_table = delta.color_table
+        image.size_of_local_color_table = int(math.log2(len(delta.color_table))) - 1
+
+    image.color_table = delta.color_table
+    image.transparent_index = delta.transparent_index
+    if graphic_control_ex is not None:
+        graphic_control_ex.transparent_color_flag = int(delta.transparent_index is not None)
+        graphic_control_ex.transparent_index = delta.transparent_index or 0
+
+    # the frame now decodes from the encoding of the delta
+    image.compressed_data = delta.encoded
+    image.lzw_minimum_code_size = int(math.ceil(math.log2(len(delta.color_table))))
+    image.decoded_color_table = list(delta.color_table)
+    image.load_index_data(delta.index_data)
+
+
+def changed_box(previous_canvas: bytes, canvas: bytes, width: int, height: int) -> tuple[int, int, int, int] | None:
+    """(left, top, right, bottom) of the pixels that differ between the canvases, None when they are the same"""
+    row_length = width * RGB_LEN_BYTE
+    changed_rows = [row for row in range(height) if canvas[row * row_length: (row + 1) * row_length] !=
+                    previous_canvas[row * row_length: (row + 1) * row_length]]
+    if not changed_rows:
+        return None
+
+    left, right = width, 0
+    for row in changed_rows:
+        start = row * row_length
+        difference = (int.from_bytes(canvas[start: start + row_length], 'big') ^
+                      int.from_bytes(previous_canvas[start: start + row_length], 'big'))
+        # the highest set bit is in the first byte that differs, and the lowest set bit in the last one
+        first_byte = row_length - 1 - (difference.bit_length() - 1) // BYTE_LEN
+        last_byte = row_length - 1 - ((difference & -difference).bit_length() - 1) // BYTE_LEN
+        left = min(left, first_byte // RGB_LEN_BYTE)
+        right = max(right, last_byte // RGB_LEN_BYTE + 1)
+    return left, changed_rows[0], right, changed_rows[LAST_ELEMENT] + 1
+
+
+def frame_delta(gif_object: Gif, image: Frame, previous_canvas: bytes, canvas: bytes) -> FrameDelta | None:
+    """
+    The smallest frame that draws canvas on previous_canvas, with the color table of image when it has the colors,
+    otherwise with a new local color table. None when no color table of up to 256 colors has them.
+    """
+    # a canvas that did not change still needs a frame for its delay time, one pixel that stays the same
+    left, top, right, bottom = changed_box(previous_canvas, canvas, gif_object.width, gif_object.height) or (0, 0, 1, 1)
+    width = right - left
+
+    colors = []
+    unchanged = []
+    for row in range(top, bottom):
+        start = (row * gif_object.width + left) * RGB_LEN_BYTE
+        row_pixels = bytes(canvas[start: start + width * RGB_LEN_BYTE])
+        previous_row_pixels = bytes(previous_canvas[start: start + width * RGB_LEN_BYTE])
+        for pixel in range(0, len(row_pixels), RGB_LEN_BYTE):
+            colors.append(row_pixels[pixel: pixel + RGB_LEN_BYTE])
+            unchanged.append(row_pixels[pixel: pixel + RGB_LEN_BYTE] ==
+                             previous_row_pixels[pixel: pixel + RGB_LEN_BYTE])
+
+    color_table = get_color_table(gif_object, image)
+    new_table = False
+    candidates = table_indices(colors, unchanged, color_table) if color_table is not None else []
+    if not candidates:
+        color_table = new_color_table(colors, unchanged)
+        new_table = True
+        candidates = table_indices(colors, unchanged, color_table) if color_table is not None else []
+        if not candidates:
+            return None
+
+    deltas = [FrameDelta(left, top, width, bottom - top, index_data, color_table, new_table, transparent_index,
+                         lzw_encode(index_data, len(color_table)))
+              for index_data, transparent_index in candidates]
+    return min(deltas, key=lambda delta: len(delta.encoded))
+
+
+def new_color_table(colors: list[bytes], unchanged: list[bool]) -> list[bytes] | None:
+    """
+    A local color table of the colors that changed and one more color for the transparent index, or of all the
+    colors when there are too many for that. None when there are more than 256 colors.
+    """
+    table_colors = sorted({color for color, same in zip(colors, unchanged) if not same})
+    if any(unchanged):
+        if len(table_colors) < PALETTE_SIZE:
+            # the transparent index is the only index with its color
+            table_colors.append(unused_color(table_colors))
+        else:
+            table_colors = sorted(set(colors))
+
+    if len(table_colors) > PALETTE_SIZE:
+        return None
+    return pad_color_table(table_colors)
+
+
+def table_indices(colors: list[bytes], unchanged: list[bool],
+                  color_table: list[bytes]) -> list[tuple[bytes, int | None]]:
+    """
+    The ways to write the pixels with color_table as (indices, transparent index): the pixels that did not change
+    get the transparent index when the table has an index no changed pixel uses, and every pixel keeps its color when
+    all the colors are in the table.
+    """
+    color_map = color_index_map(color_table)
+    changed_colors = {color for color, same in zip(colors, unchanged) if not same}
+    if not changed_colors <= color_map.keys():
+        return []
+
+    candidates = []
+    if any(unchanged):
+        # the writer maps every color to its first index, so only the first index of a color can be transparent
+        used_indices = {color_map[color] for color in changed_colors}
+        transparent_index = next((index for index, color in enumerate(color_table)
+                                  if color_map[color] == index and index not in used_indices), None)
+        if transparent_index is not None:
+            candidates.append((bytes(transparent_index if same else color_map[color]
+                                     for color, same in zip(colors, unchanged)), transparent_index))
+
+    if set(colors) <= color_map.keys():
+        candidates.append((bytes(color_map[color] for color in colors), None))
+    return candidates
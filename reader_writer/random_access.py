@@ -0,0 +1,144 @@
+import os
+
+from BitStream import ByteStreamReader
+from reader_writer.constants import *
+
+from gif import *
+from .canvas import Canvas
+from .reader import GifSource, map_gif, decode_header, decode_logical_screen_descriptor, decode_global_color_table, \
+    decode_graphic_control_extension, decode_image_descriptor, decode_local_color_table, decode_image_data
+from .scanner import GifIndex, FrameIndex, scan_blocks, save_index, load_index, is_index_of
+
+
+def get_frame(io: GifSource, n: int, gif_index: GifIndex | None = None,
+              index_path: str | os.PathLike | None = None) -> Frame:
+    """
+    Decode and composite only frame n of the gif.
+    The block index tells where every frame starts, so decoding starts at the nearest frame that does not depend on
+    the ones before it (a full canvas opaque frame, or the frame after a full canvas frame disposed to the background)
+    and only the frames the canvas of frame n is made of are decoded.
+    Without gif_index the index is loaded from index_path when it was made from this gif (it has the size and the
+    hash the index recorded), otherwise the gif is scanned and the index is saved to index_path (when given), so the
+    next call does not scan again.
+    """
+    with map_gif(io) as gif_data:
+        gif_stream = ByteStreamReader(gif_data)
+        try:
+            if gif_index is None:
+                gif_index = read_index(gif_stream, index_path)
+            return decode_frame(gif_stream, gif_index, n)
+        finally:
+            gif_stream.release()
+
+
+def index_gif(io: GifSource, index_path: str | os.PathLike | None = None) -> GifIndex:
+    """the block index of the gif, from the sidecar file at index_path when it was made from this gif"""
+    with map_gif(io) as gif_data:
+        gif_stream = ByteStreamReader(gif_data)
+        try:
+            return read_index(gif_stream, index_path)
+        finally:
+            gif_stream.release()
+
+
+def read_index(gif_stream: ByteStreamReader, index_path: str | os.PathLike | None) -> GifIndex:
+    if index_path is not None and os.path.exists(index_path):
+        gif_index = load_index(index_path)
+        if is_index_of(gif_index, gif_stream):
+            return gif_index
+
+    gif_index = scan_blocks(gif_stream)
+    if index_path is not None:
+        save_index(gif_index, index_path)
+    return gif_index
+
+
+def covers_canvas(gif_index: GifIndex, frame_index: FrameIndex) -> bool:
+    return (frame_index.left == 0 and frame_index.top == 0 and frame_index.width >= gif_index.width and
+            frame_index.height >= gif_index.height)
+
+
+def is_independent(gif_index: GifIndex, frame_index: FrameIndex) -> bool:
+    """the frame covers the whole canvas with no transparent pixels, so nothing drawn before it shows through"""
+    return covers_canvas(gif_index, frame_index) and frame_index.transparent_index is None
+
+
+def frame_chain(gif_index: GifIndex, n: int) -> tuple[list[int], bool]:
+    """
+    The frames that must be drawn, oldest first, to composite frame n, and whether the first of them is drawn on the
+    initial canvas of the gif (otherwise it is drawn on the background color).
+    Walks back from frame n: frames with disposal 3 are skipped because the canvas is restored to what it was before
+    them, and the walk stops at an independent frame or after a full canvas frame with disposal 2.
+    """
+    chain = [n]
+    current = n
+    while not is_independent(gif_index, gif_index.frames[current]):
+        previous = current - 1
+        while previous >= 0 and gif_index.frames[previous].disposal == DISPOSAL_OPTION_THREE:
+            previous -= 1
+
+        if previous < 0:
+            chain.reverse()
+            return chain, True
+
+        previous_frame = gif_index.frames[previous]
+        if previous_frame.disposal == DISPOSAL_OPTION_TWO and covers_canvas(gif_index, previous_frame):
+            break
+
+        chain.append(previous)
+        current = previous
+
+    chain.reverse()
+    return chain, False
+
+
+def first_color_table(gif_stream: ByteStreamReader, gif_object: Gif, gif_index: GifIndex) -> list[bytes] | None:
+    """the color table of the first frame, the initial canvas is filled with its background color"""
+    first_frame = gif_index.frames[0]
+    if not first_frame.local_color_table_flag:
+        return gif_object.global_color_table
+
+    first_frame_gif = Gif()
+    gif_stream.pos = first_frame.offset + BLOCK_PREFIX_LEN_BYTE
+    decode_image_descriptor(gif_stream, first_frame_gif)
+    decode_local_color_table(gif_stream, first_frame_gif)
+    return first_frame_gif.images[LAST_ELEMENT].local_color_table
+
+
+def decode_frame(gif_stream: ByteStreamReader, gif_index: GifIndex, n: int) -> Frame:
+    n = range(len(gif_index.frames))[n]
+    chain, from_first_frame = frame_chain(gif_index, n)
+
+    gif_object = Gif()
+    gif_stream.pos = 0
+    decode_header(gif_stream, gif_object)
+    decode_logical_screen_descriptor(gif_stream, gif_object)
+    if gif_object.global_color_table_size > MIN_TABLE_SIZE:
+        decode_global_color_table(gif_stream, gif_object)
+
+    canvas = Canvas(gif_object)
+    if not from_first_frame:
+        canvas.fill_background()
+    elif chain[0] != 0:
+        # the frames before the chain are all restored, what is left is the initial canvas of the first frame
+        canvas.fill(canvas.background_color(first_color_table(gif_stream, gif_object, gif_index)))
+
+    current_image = None
+    for index in chain:
+        frame_index = gif_index.frames[index]
+
+        # the graphic control extension applies only to the image after it
+        gif_object.graphic_control_extensions.clear()
+        if frame_index.graphic_control_offset is not None:
+            # skip the extension introducer and label
+            gif_stream.pos = frame_index.graphic_control_offset + 2 * BLOCK_PREFIX_LEN_BYTE
+            decode_graphic_control_extension(gif_stream, gif_object)
+
+        gif_stream.pos = frame_index.offset + BLOCK_PREFIX_LEN_BYTE
+        decode_image_descriptor(gif_stream, gif_object)
+        current_image = gif_object.images[LAST_ELEMENT]
+        if current_image.local_color_table_flag:
+            decode_local_color_table(gif_stream, gif_object)
+        decode_image_data(gif_stream, gif_object, canvas)
+
+    return current_image
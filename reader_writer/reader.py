@@ -1,23 +1,156 @@
-import binascii
+import contextlib
+import functools
 import math
+import mmap
+import os
+import stat
 import typing
+from concurrent.futures import ProcessPoolExecutor
 
-import bitstring
 from PIL import Image as Image_PIL
 
-from BitStream import BitStreamReader
+from BitStream import ByteStreamReader
 from reader_writer.constants import *
 
 from gif import *
 from lzw import lzw_decode
 from .block_prefix import BlockPrefix
+from .canvas import Canvas
+from .frame_cache import FrameCache, cache_key
 
+GifSource = typing.BinaryIO | str | os.PathLike | int
 
-def read_gif(io: typing.BinaryIO, create_images: bool) -> Gif:
+
+def read_gif(io: GifSource, create_images: bool, lazy: bool = False, workers: int | None = None,
+             cache: FrameCache | None = None) -> Gif:
+    """
+    Decode the whole gif.
+    io can be a path, a file descriptor or a binary file, files on disk are memory mapped instead of read.
+    In lazy mode the frames keep only their compressed image data. The lzw decoding of a frame runs on the first
+    access to its index_data, and the compositing of a frame (and of the frames it is drawn on) runs on the first
+    access to its img or image_data, so only the frames that are used are decoded.
+    When workers is given, the blocks are scanned first, then the frames are lzw decoded in parallel by that many
+    processes, and at last the frames are composited in order (unless lazy is set too).
+    With a cache, the palette indices of every frame are looked up by the hash of its compressed data and the
+    composited frames by the hash of the file, so gifs (and frames) that were decoded before skip the lzw decoding.
+    """
     gif_object: Gif = Gif()
 
-    gif_stream: BitStreamReader = BitStreamReader(bitstring.ConstBitStream(io))
+    with map_gif(io) as gif_data:
+        file_key = cache_key(gif_data) if cache is not None else None
+        gif_stream: ByteStreamReader = ByteStreamReader(gif_data)
+        try:
+            for _ in decode_blocks(gif_stream, gif_object, create_images, lazy or bool(workers), cache, file_key):
+                pass
+        finally:
+            gif_stream.release()
+
+    if workers:
+        decode_images(gif_object, workers, cache)
+        if create_images and not lazy:
+            for image in gif_object.images:
+                image.composite()
+
+    return gif_object
+
+
+def decode_images(gif_object: Gif, workers: int, cache: FrameCache | None = None) -> None:
+    """lzw decode all the frames that are not decoded yet (and not in the cache) in a process pool"""
+    frames = [block for block in gif_object.structure if isinstance(block, Frame) and block.decoder is not None]
+    if cache is not None:
+        keys = {id(frame): frame_cache_key(frame.compressed_data, frame.lzw_minimum_code_size) for frame in frames}
+        for frame in frames:
+            if (index_data := cache.get(keys[id(frame)])) is not None:
+                frame.load_index_data(index_data)
+        frames = [frame for frame in frames if frame.decoder is not None]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        decoded_images = executor.map(lzw_decode, [frame.compressed_data for frame in frames],
+                                      [frame.lzw_minimum_code_size for frame in frames])
+        for frame, index_data in zip(frames, decoded_images):
+            frame.load_index_data(index_data)
+            if cache is not None:
+                cache.put(keys[id(frame)], index_data)
+
+
+def iter_frames(io: GifSource, cache: FrameCache | None = None, gif_object: Gif | None = None
+                ) -> typing.Iterator[tuple[Frame, GraphicControlExtension | None]]:
+    """
+    Decode the gif one frame at a time.
+    Yields every composited frame together with its graphic control extension. Only the canvas the next frame is
+    drawn on is kept between frames, so memory does not grow with the number of frames.
+    When gif_object is given, it gets the header, the logical screen descriptor, the global color table and every
+    application extension read so far (like the NETSCAPE2.0 loop count). So once the first frame is yielded a
+    GifStreamWriter can be made from gif_object, and the application extensions written before the frames.
+    """
+    gif_object = Gif() if gif_object is None else gif_object
+
+    with map_gif(io) as gif_data:
+        file_key = cache_key(gif_data) if cache is not None else None
+        gif_stream: ByteStreamReader = ByteStreamReader(gif_data)
+        try:
+            for frame in decode_blocks(gif_stream, gif_object, True, cache=cache, file_key=file_key):
+                yield frame, get_graphic_control_extension(gif_object, frame)
+
+                # keep only the canvas of the next frame, the last graphic control extension and the application
+                # extensions (they are few and small)
+                del gif_object.images[:LAST_ELEMENT]
+                del gif_object.graphic_control_extensions[:LAST_ELEMENT]
+                gif_object.structure.clear()
+                gif_object.local_color_tables.clear()
+                gif_object.comments_extensions.clear()
+                gif_object.plain_text_extensions.clear()
+        finally:
+            gif_stream.release()
+
+
+@contextlib.contextmanager
+def map_gif(source: GifSource) -> typing.Iterator[bytes | memoryview]:
+    """
+    Give the bytes of the gif from the current position of the source.
+    Paths, file descriptors and files on disk are memory mapped, so the file is not copied into the process memory
+    and processes that read the same file share its pages. Other file objects (like BytesIO) are read.
+    All the views of the mapped file must be released before leaving the context.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as gif_file:
+            with map_gif(gif_file) as gif_data:
+                yield gif_data
+        return
+
+    if isinstance(source, int):
+        with open(source, "rb", closefd=False) as gif_file:
+            with map_gif(gif_file) as gif_data:
+                yield gif_data
+        return
+
+    try:
+        fd = source.fileno()
+        offset = source.tell()
+        file_stat = os.fstat(fd)
+    except (AttributeError, OSError):
+        file_stat = None
 
+    # only regular files with data after the position can be mapped (not pipes, sockets or BytesIO)
+    if file_stat is None or not stat.S_ISREG(file_stat.st_mode) or file_stat.st_size <= offset:
+        yield source.read()
+        return
+
+    with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped_file:
+        gif_data = memoryview(mapped_file)[offset:]
+        try:
+            yield gif_data
+        finally:
+            gif_data.release()
+
+
+def decode_blocks(gif_stream: ByteStreamReader, gif_object: Gif, create_images: bool, lazy: bool = False,
+                  cache: FrameCache | None = None, file_key: str | None = None) -> typing.Iterator[Frame]:
+    """
+    Decode all the blocks of the gif into gif_object, and yield every frame once it and its disposal are decoded.
+    file_key is the hash of the whole gif, the composited frames are cached under it and their frame number.
+    """
+    frame_number = 0
     decode_header(gif_stream, gif_object)
     decode_logical_screen_descriptor(gif_stream, gif_object)
 
@@ -25,52 +158,69 @@ def read_gif(io: typing.BinaryIO, create_images: bool) -> Gif:
     if gif_object.global_color_table_size > MIN_TABLE_SIZE:
         decode_global_color_table(gif_stream, gif_object)
 
+    # all the frames are drawn in order on one canvas
+    canvas = Canvas(gif_object) if create_images else None
+
+    while True:
+        canvas_key = f"{file_key}-{frame_number}" if file_key is not None else None
+        prefix = decode_block(gif_stream, gif_object, canvas, lazy, cache, canvas_key)
+        if prefix is BlockPrefix.Trailer:
+            break
+        if prefix is BlockPrefix.ImageDescriptor:
+            frame_number += 1
+            yield gif_object.images[LAST_ELEMENT]
+
+
+def decode_block(gif_stream: ByteStreamReader, gif_object: Gif, canvas: Canvas | None, lazy: bool = False,
+                 cache: FrameCache | None = None, canvas_key: str | None = None) -> BlockPrefix:
+    """
+    Decode the next block into gif_object (and draw it on the canvas when it is a frame).
+    :return: the prefix of the block, the label of the extension for the known extensions
+    """
     # Read the first byte to check if the next block is extension or image descriptor.
-    while (prefix := BlockPrefix(gif_stream.read_bytes(BLOCK_PREFIX_LEN_BYTE))) != BlockPrefix.Trailer:
-        if prefix is BlockPrefix.Extension:
-            # Check which type of extension is the next block.
-            extension_label: bytes = gif_stream.read_bytes(BLOCK_PREFIX_LEN_BYTE)
-            prefix = BlockPrefix(extension_label)
+    prefix = BlockPrefix(gif_stream.read_bytes(BLOCK_PREFIX_LEN_BYTE))
+    if prefix is BlockPrefix.Extension:
+        # Check which type of extension is the next block.
+        extension_label: bytes = gif_stream.read_bytes(BLOCK_PREFIX_LEN_BYTE)
+        prefix = BlockPrefix(extension_label)
 
-            if prefix is BlockPrefix.ApplicationExtension:
-                decode_application_extension(gif_stream, gif_object)
+        if prefix is BlockPrefix.ApplicationExtension:
+            decode_application_extension(gif_stream, gif_object)
 
-            elif prefix is BlockPrefix.GraphicControlExtension:
-                decode_graphic_control_extension(gif_stream, gif_object)
+        elif prefix is BlockPrefix.GraphicControlExtension:
+            decode_graphic_control_extension(gif_stream, gif_object)
 
-            elif prefix is BlockPrefix.CommentExtension:
-                decode_comment_extension(gif_stream, gif_object)
+        elif prefix is BlockPrefix.CommentExtension:
+            decode_comment_extension(gif_stream, gif_object)
 
-            elif prefix is BlockPrefix.PlainTextExtension:
-                decode_plain_text(gif_stream, gif_object)
+        elif prefix is BlockPrefix.PlainTextExtension:
+            decode_plain_text(gif_stream, gif_object)
 
-        elif prefix is BlockPrefix.ImageDescriptor:
-            decode_image_descriptor(gif_stream, gif_object)
+        else:
+            # an unknown extension, its sub blocks are skipped
+            gif_stream.read_sub_block_spans()
+            prefix = BlockPrefix.Extension
 
-            # Check if there is a Local color table for this image.
-            if gif_object.images[LAST_ELEMENT].local_color_table_flag:
-                decode_local_color_table(gif_stream, gif_object)
+    elif prefix is BlockPrefix.ImageDescriptor:
+        decode_image_descriptor(gif_stream, gif_object)
 
-            decode_image_data(gif_stream, gif_object, create_images)
+        # Check if there is a Local color table for this image.
+        if gif_object.images[LAST_ELEMENT].local_color_table_flag:
+            decode_local_color_table(gif_stream, gif_object)
 
-            last_graphic_control_index = gif_object.images[LAST_ELEMENT].index_graphic_control_ex
-            last_graphic_control_disposal = gif_object.graphic_control_extensions[last_graphic_control_index].disposal
-            if last_graphic_control_disposal == DISPOSAL_OPTION_THREE:
-                gif_object.images.append(gif_object.images[PENULTIMATE])
-            elif last_graphic_control_disposal == DISPOSAL_OPTION_TWO:
-                insert_background_frame(gif_object)
+        decode_image_data(gif_stream, gif_object, canvas, lazy, cache, canvas_key)
 
-        elif prefix is BlockPrefix.NONE:
-            raise IncorrectFileFormat("prefix is incorrect")
+    elif prefix is BlockPrefix.NONE:
+        raise IncorrectFileFormat("prefix is incorrect")
 
-    return gif_object
+    return prefix
 
 
-def decode_header(gif_stream: BitStreamReader, gif_object: Gif) -> None:
+def decode_header(gif_stream: ByteStreamReader, gif_object: Gif) -> None:
     gif_object.version = gif_stream.read_decoded(VERSION_LEN_BYTE)
 
 
-def decode_logical_screen_descriptor(gif_stream: BitStreamReader, gif_object: Gif) -> None:
+def decode_logical_screen_descriptor(gif_stream: ByteStreamReader, gif_object: Gif) -> None:
     gif_object.width = gif_stream.read_unsigned_integer(GIF_WIDTH_LEN_BYTE, 'bytes')
     gif_object.height = gif_stream.read_unsigned_integer(GIF_HEIGHT_LEN_BYTE, 'bytes')
 
@@ -92,29 +242,16 @@ def decode_logical_screen_descriptor(gif_stream: BitStreamReader, gif_object: Gi
     gif_object.pixel_aspect_ratio = (pixel_ratio_value + WIDER_RANGE_RATIO) / NORMALIZED_VALUE
 
 
-def insert_background_frame(gif_object: Gif):
-    prev_image = gif_object.images[LAST_ELEMENT]
-    current_image = Frame()
-    current_image.index_graphic_control_ex = None
-
-    current_image.left = prev_image.left
-    current_image.top = prev_image.top
-    current_image.width = prev_image.width
-    current_image.height = prev_image.height
-
-    current_image.local_color_table_flag = False
-    current_image.interlace_flag = False
-    current_image.sort_flag = False
-    current_image.reserved = DEFAULT_RESERVED_SIZE
-    current_image.size_of_local_color_table = DEFAULT_LOCAL_COLOR_TABLE_SIZE
-
-    background_color: bytes = gif_object.global_color_table[gif_object.background_color_index]
-    current_image.image_data = [background_color] * prev_image.width * prev_image.height
-
-    gif_object.images.append(current_image)
+def read_sub_blocks(gif_stream: ByteStreamReader) -> bytes:
+    """
+    Read the data sub blocks up to the block terminator.
+    every sub block start with a byte that present the size of it. the sub blocks are only located while scanning,
+    and their data is joined with a single copy at the end.
+    """
+    return gif_stream.join_spans(gif_stream.read_sub_block_spans())
 
 
-def decode_global_color_table(gif_stream: BitStreamReader, gif_object: Gif) -> None:
+def decode_global_color_table(gif_stream: ByteStreamReader, gif_object: Gif) -> None:
     """
     Decode global color table.
     We read the number of bytes we received in the flag in Logical Screen Descriptor,
@@ -124,7 +261,7 @@ def decode_global_color_table(gif_stream: BitStreamReader, gif_object: Gif) -> N
         int(gif_object.global_color_table_size))]
 
 
-def decode_application_extension(gif_stream: BitStreamReader, gif_object: Gif) -> None:
+def decode_application_extension(gif_stream: ByteStreamReader, gif_object: Gif) -> None:
     app_ex = ApplicationExtension()
 
     block_size = gif_stream.read_unsigned_integer(BLOCK_SIZE_LEN_BYTE, 'bytes')
@@ -135,17 +272,12 @@ def decode_application_extension(gif_stream: BitStreamReader, gif_object: Gif) -
     app_ex.application_name = gif_stream.read_bytes(APPLICATION_NAME_LEN_BYTE).decode("utf-8")
     app_ex.identify = gif_stream.read_bytes(APPLICATION_IDENTIFY_LEN_BYTE).decode("utf-8")
 
-    application_data = b''
-    while (number_of_sub_block_bytes := gif_stream.read_unsigned_integer(BLOCK_SIZE_LEN_BYTE, 'bytes')) != END_OF_DATA:
-        sub_block = gif_stream.read_bytes(number_of_sub_block_bytes)
-        application_data += sub_block
-
-    app_ex.data = application_data
+    app_ex.data = read_sub_blocks(gif_stream)
     gif_object.applications_extensions.append(app_ex)
     gif_object.structure.append(app_ex)
 
 
-def decode_graphic_control_extension(gif_stream: BitStreamReader, gif_object: Gif) -> None:
+def decode_graphic_control_extension(gif_stream: ByteStreamReader, gif_object: Gif) -> None:
     graphic_control_ex = GraphicControlExtension()
 
     # always 4 bytes
@@ -174,12 +306,9 @@ def decode_graphic_control_extension(gif_stream: BitStreamReader, gif_object: Gi
     gif_object.structure.append(graphic_control_ex)
 
 
-def decode_image_descriptor(gif_stream: BitStreamReader, gif_object: Gif) -> None:
+def decode_image_descriptor(gif_stream: ByteStreamReader, gif_object: Gif) -> None:
     current_image = Frame()
-    if gif_object.graphic_control_extensions == []:
-        current_image.index_graphic_control_ex = None
-    else:
-        current_image.index_graphic_control_ex = len(gif_object.graphic_control_extensions) - 1
+    current_image.index_graphic_control_ex = pending_graphic_control_extension(gif_object)
 
     current_image.left = gif_stream.read_unsigned_integer(FRAME_LEFT_LEN_BYTE, 'bytes')
     current_image.top = gif_stream.read_unsigned_integer(FRAME_TOP_LEN_BYTE, 'bytes')
@@ -196,7 +325,7 @@ def decode_image_descriptor(gif_stream: BitStreamReader, gif_object: Gif) -> Non
     gif_object.structure.append(current_image)
 
 
-def decode_local_color_table(gif_stream: BitStreamReader, gif_object: Gif) -> None:
+def decode_local_color_table(gif_stream: ByteStreamReader, gif_object: Gif) -> None:
     current_image = gif_object.images[LAST_ELEMENT]
     size_of_color_table = math.pow(2, current_image.size_of_local_color_table + 1)
 
@@ -205,125 +334,133 @@ def decode_local_color_table(gif_stream: BitStreamReader, gif_object: Gif) -> No
     current_image.local_color_table = colors_array
 
 
-def decode_image_data(gif_stream: BitStreamReader, gif_object: Gif, create_images: bool) -> None:
+def decode_image_data(gif_stream: ByteStreamReader, gif_object: Gif, canvas: Canvas | None, lazy: bool = False,
+                      cache: FrameCache | None = None, canvas_key: str | None = None) -> None:
+    """
+    Read the image data of the last frame, decode it (unless lazy) and draw the frame on the canvas (when there is
+    one, in lazy mode the drawing runs when the image of the frame is used).
+    """
     current_image = gif_object.images[LAST_ELEMENT]
     current_image.lzw_minimum_code_size = gif_stream.read_unsigned_integer(LZW_MINIMUM_CODE_SIZE_LEN_BYTE, 'bytes')
 
     assert (MINIMUM_LZW_CS <= current_image.lzw_minimum_code_size <= MAXIMUM_LZW_CS
             ), f"lzw minimum code size is out of rage (should be between {MINIMUM_LZW_CS} to {MAXIMUM_LZW_CS})"
 
-    compressed_sub_block = b''
-    while (number_of_sub_block_bytes := gif_stream.read_unsigned_integer(BLOCK_SIZE_LEN_BYTE, 'bytes')) != END_OF_DATA:
-        compressed_sub_block += gif_stream.read_bytes(number_of_sub_block_bytes)
+    compressed_sub_block = read_sub_blocks(gif_stream)
+
+    if current_image.local_color_table_flag:
+        current_image.color_table = gif_object.local_color_tables[LAST_ELEMENT]
+    else:
+        current_image.color_table = gif_object.global_color_table
+
+    # kept so an unchanged frame can be written back without encoding it again
+    current_image.compressed_data = compressed_sub_block
+    current_image.decoded_color_table = list(current_image.color_table or [])
+
+    graphic_control_ex = get_graphic_control_extension(gif_object, current_image)
+    if graphic_control_ex is not None and graphic_control_ex.transparent_color_flag:
+        current_image.transparent_index = graphic_control_ex.transparent_index
+    disposal = graphic_control_ex.disposal if graphic_control_ex is not None else None
+
     if not compressed_sub_block:
-        current_image.img = None
-        return
+        current_image.load_index_data(b'')
+    elif lazy:
+        current_image.decoder = decode_frame_indices if cache is None else functools.partial(decode_frame_indices,
+                                                                                             cache=cache)
+        current_image.index_data = None
+    elif cache is None:
+        current_image.load_index_data(lzw_decode(compressed_sub_block, current_image.lzw_minimum_code_size))
+    else:
+        # the indices are taken from the cache (or decoded) when they are used, a cached canvas does not need them
+        current_image.decoder = functools.partial(decode_frame_indices, cache=cache)
+        current_image.index_data = None
 
-    res, index_length = lzw_decode(compressed_sub_block, current_image.lzw_minimum_code_size)
+    if canvas is None:
+        return
 
-    if current_image.local_color_table_flag:
-        local_color_table = gif_object.local_color_tables[LAST_ELEMENT]
+    if lazy:
+        # the frames share the canvas, so the frame before must be drawn first
+        current_image.previous_frame = gif_object.images[PENULTIMATE] if len(gif_object.images) > 1 else None
+        current_image.compositor = functools.partial(create_img, canvas, current_image, disposal, cache, canvas_key)
     else:
-        local_color_table = gif_object.global_color_table
+        create_img(canvas, current_image, disposal, cache, canvas_key)
 
-    for pos in range(0, len(res), index_length):
-        current_index = int((res[pos:pos + index_length]), 2)
 
-        if (current_index == gif_object.graphic_control_extensions[LAST_ELEMENT].transparent_index and
-                gif_object.graphic_control_extensions[LAST_ELEMENT].transparent_color_flag):
-            # if the index it transparent we put -1 and in the future we will change it to correct color
-            current_image.image_data.append(TRANSPARENT_VALUE)
-        else:
-            current_image.image_data.append(local_color_table[current_index])
-        current_image.raw_data.append(local_color_table[current_index])
-    if create_images:
-        create_img(gif_object, current_image.image_data)
+def decode_frame_indices(image: Frame, cache: FrameCache | None = None) -> bytes:
+    return decode_indices(image.compressed_data, image.lzw_minimum_code_size, cache)
 
 
-def create_img(gif_object: Gif, image_data: list[bytes]) -> None:
-    current_image = gif_object.images[LAST_ELEMENT]
-    #  for all the images except the first
-    image_size = current_image.width * current_image.height
-    assert image_size == len(
-        image_data), f"size mismatch: gif_size {image_size} does not match the length of image_information {len(image_data)}"
-
-    curr_top = current_image.top
-    curr_left = current_image.left
-    curr_width = current_image.width
-    curr_height = current_image.height
-
-    if len(gif_object.images) == 1:
-        if current_image.local_color_table_flag:
-            background_color = gif_object.local_color_tables[LAST_ELEMENT][gif_object.background_color_index]
-        else:
-            background_color = gif_object.global_color_table[gif_object.background_color_index]
+def frame_cache_key(compressed_data: bytes, lzw_minimum_code_size: int) -> str:
+    return cache_key(bytes([lzw_minimum_code_size]), compressed_data)
+
+
+def decode_indices(compressed_data: bytes, lzw_minimum_code_size: int, cache: FrameCache | None = None) -> bytes:
+    """lzw decode the image data, or take the indices from the cache when the same data was decoded before"""
+    if cache is None:
+        return lzw_decode(compressed_data, lzw_minimum_code_size)
+
+    key = frame_cache_key(compressed_data, lzw_minimum_code_size)
+    index_data = cache.get(key)
+    if index_data is None:
+        index_data = lzw_decode(compressed_data, lzw_minimum_code_size)
+        cache.put(key, index_data)
+    return index_data
+
+
+def pending_graphic_control_extension(gif_object: Gif) -> int | None:
+    """
+    The index of the graphic control extension of the next image: the last one read, when no graphic rendering block
+    (image or plain text) came after it. A graphic control extension applies only to the block right after it.
+    """
+    for block in reversed(gif_object.structure):
+        if isinstance(block, GraphicControlExtension):
+            return len(gif_object.graphic_control_extensions) - 1
+        if isinstance(block, (Frame, PlainTextExtension)):
+            return None
+    return None
 
-        new_img_data = [background_color] * gif_object.height * gif_object.width
-        last_width = gif_object.width
 
+def get_graphic_control_extension(gif_object: Gif, image: Frame) -> GraphicControlExtension | None:
+    if image.index_graphic_control_ex is None:
+        return None
+    return gif_object.graphic_control_extensions[image.index_graphic_control_ex]
+
+
+def create_img(canvas: Canvas, current_image: Frame, disposal: int | None, cache: FrameCache | None = None,
+               canvas_key: str | None = None) -> None:
+    if cache is not None and canvas_key is not None and (pixels := cache.get(canvas_key)) is not None:
+        canvas.load(current_image, disposal, pixels)
     else:
-        last_image = gif_object.images[PENULTIMATE]
-        last_width = last_image.width
-        new_img_data = last_image.image_data
-
-        # fill all the TRANSPARENT_VALUE in the current Image with colors from last_image
-        for i in range(curr_height):
-            for j in range(curr_width):
-                if current_image.image_data[i * curr_width + j] == TRANSPARENT_VALUE:
-                    current_image.image_data[i * curr_width + j] = last_image.image_data[
-                        (i + curr_top) * last_width + j + curr_left]
-
-    # at first the new image data get the value of the last image. all the overlap indexes getting the current
-    # image colors
-    pos = 0
-    for line in range(curr_top, curr_top + curr_height):
-        new_img_data[
-        line * last_width + curr_left: line * last_width + curr_left + curr_width] = current_image.image_data[
-                                                                                     pos: pos + curr_width]
-        pos += curr_width
-
-    current_image.image_data = new_img_data
-
-    img = Image_PIL.new('RGB', (gif_object.width, gif_object.height))
-    rgb_array = ["#" + binascii.hexlify(b).decode('utf-8').upper() for b in current_image.image_data]
-
-    # Set the pixel values of the image using the RGB array
-    pixels = img.load()
-
-    ''' 
-    for each pixel - we take specific color ("#FF0000") and divide it to 3 parts("FF","00","00") of RGB.
-    then convert it from hex(16) to int (255,0,0), in the end we get tuple of three numbers that represent the color
-    The code iterates over each pixel in an image represented as a two-dimensional array of hex color codes.
-    It then extracts the red, green, and blue color components of each pixel by converting the hex codes to integers
-    and stores them as a tuple of three integers
-    '''
-    for row in range(gif_object.width):
-        for column in range(gif_object.height):
-            hex_color = rgb_array[column * gif_object.width + row]
-            r, g, b = (
-                int(hex_color[R_START:R_END], HEX_SIZE), int(hex_color[G_START:G_END], HEX_SIZE),
-                int(hex_color[B_START:B_END], HEX_SIZE)
-            )
-            pixels[row, column] = (r, g, b)
-    current_image.img = img
-
-
-def decode_comment_extension(gif_stream: BitStreamReader, gif_object: Gif) -> None:
+        image_size = current_image.width * current_image.height
+        assert not current_image.index_data or image_size == len(current_image.index_data), \
+            f"size mismatch: gif_size {image_size} does not match the length of image_information " \
+            f"{len(current_image.index_data)}"
+
+        canvas.draw(current_image, disposal)
+        if not current_image.index_data:
+            # a frame without image data changes nothing and has no image
+            current_image.img = None
+            return
+        if cache is not None and canvas_key is not None:
+            cache.put(canvas_key, canvas.pixels)
+
+    set_canvas(canvas, current_image, canvas.snapshot())
+
+
+def set_canvas(canvas: Canvas, current_image: Frame, pixels: bytearray) -> None:
+    current_image.image_data = pixels
+    current_image.img = Image_PIL.frombuffer('RGB', (canvas.width, canvas.height), pixels, 'raw', 'RGB', 0, 1)
+
+
+def decode_comment_extension(gif_stream: ByteStreamReader, gif_object: Gif) -> None:
     """decode comment extension"""
     comment_ex = CommentExtension()
-    data = b''
-    # every sub block start with a bye that present the size of it.
-    sub_block_size = gif_stream.read_unsigned_integer(BLOCK_SIZE_LEN_BYTE, "bytes")
-    while sub_block_size != END_OF_DATA:
-        data += gif_stream.read_bytes(sub_block_size)
-        sub_block_size = gif_stream.read_unsigned_integer(BLOCK_SIZE_LEN_BYTE, "bytes")
-
-    comment_ex.data = data
+    comment_ex.data = read_sub_blocks(gif_stream)
     gif_object.comments_extensions.append(comment_ex)
     gif_object.structure.append(comment_ex)
 
 
-def decode_plain_text(gif_stream: BitStreamReader, gif_object: Gif) -> None:
+def decode_plain_text(gif_stream: ByteStreamReader, gif_object: Gif) -> None:
     plain_text_ex = PlainTextExtension()
 
     # Read the block size (always 12)
@@ -341,13 +478,6 @@ def decode_plain_text(gif_stream: BitStreamReader, gif_object: Gif) -> None:
     plain_text_ex.text_color = gif_stream.read_unsigned_integer(PLAIN_TEXT_TEXT_COLOR_LEN_BYTE, "bytes")
     plain_text_ex.background_color = gif_stream.read_unsigned_integer(PLAIN_TEXT_BACKGROUND_COLOR_LEN_BYTE, "bytes")
 
-    data = b''
-    # every data sub block start with a bye that present the size of it.
-    sub_block_size = gif_stream.read_unsigned_integer(BLOCK_SIZE_LEN_BYTE, "bytes")
-    while sub_block_size != END_OF_DATA:
-        data += gif_stream.read_bytes(sub_block_size)
-        sub_block_size = gif_stream.read_unsigned_integer(BLOCK_SIZE_LEN_BYTE, "bytes")
-
-    plain_text_ex.data = data
+    plain_text_ex.data = read_sub_blocks(gif_stream)
     gif_object.plain_text_extensions.append(plain_text_ex)
     gif_object.structure.append(plain_text_ex)
@@ -0,0 +1,193 @@
+import json
+import os
+
+import attrs
+from attrs import define, field
+
+from BitStream import ByteStreamReader
+from reader_writer.constants import *
+
+from gif import *
+from .block_prefix import BlockPrefix
+from .frame_cache import cache_key
+from .reader import GifSource, map_gif, decode_header, decode_logical_screen_descriptor, \
+    decode_application_extension, decode_graphic_control_extension, decode_image_descriptor
+
+
+@define
+class BlockIndex:
+    # ImageDescriptor, or the label of the extension
+    prefix: BlockPrefix
+    # offset of the first byte of the block (the introducer) and its size in bytes, up to the block terminator
+    offset: int
+    size: int
+
+
+@define
+class FrameIndex:
+    # offset of the image descriptor, and of the lzw minimum code size that starts the image data
+    offset: int
+    data_offset: int
+
+    left: int
+    top: int
+    width: int
+    height: int
+    local_color_table_flag: bool
+    interlace_flag: bool
+
+    # from the graphic control extension of the frame, None if the frame has none
+    graphic_control_offset: int | None = field(default=None)
+    disposal: int | None = field(default=None)
+    delay_time: int | None = field(default=None)
+    transparent_index: int | None = field(default=None)
+
+
+@define
+class GifIndex:
+    version: str
+    width: int
+    height: int
+    global_color_table_size: int
+    background_color_index: int
+    # from the NETSCAPE2.0 application extension, 0 is forever and None if the gif does not loop
+    loop_count: int | None = field(default=None)
+    # the number of bytes of the gif, up to and including the trailer
+    size: int | None = field(default=None)
+    # the hash of the gif up to the trailer, to check that a saved index still belongs to the gif
+    fingerprint: str | None = field(default=None)
+
+    frames: list[FrameIndex] = field(factory=list, repr=False)
+    blocks: list[BlockIndex] = field(factory=list, repr=False)
+
+    @property
+    def duration(self) -> int:
+        """the total delay time of all the frames, in hundredths of a second"""
+        return sum(frame.delay_time or 0 for frame in self.frames)
+
+
+def scan_gif(io: GifSource) -> GifIndex:
+    """
+    Walk the block structure of the gif without decoding any image.
+    The image data sub blocks (and the comment and plain text ones) are skipped by their size bytes, only the
+    header, the descriptors and the graphic control and application extensions are decoded.
+    """
+    with map_gif(io) as gif_data:
+        gif_stream = ByteStreamReader(gif_data)
+        try:
+            return scan_blocks(gif_stream)
+        finally:
+            gif_stream.release()
+
+
+def scan_blocks(gif_stream: ByteStreamReader) -> GifIndex:
+    gif_object = Gif()
+    decode_header(gif_stream, gif_object)
+    decode_logical_screen_descriptor(gif_stream, gif_object)
+    gif_stream.skip(gif_object.global_color_table_size * RGB_LEN_BYTE, 'bytes')
+
+    gif_index = GifIndex(gif_object.version, gif_object.width, gif_object.height,
+                         gif_object.global_color_table_size, gif_object.background_color_index)
+
+    # the graphic control extension applies to the next graphic rendering block only
+    graphic_control_ex: GraphicControlExtension | None = None
+    graphic_control_offset: int | None = None
+
+    while True:
+        offset = gif_stream.pos
+        prefix = BlockPrefix(gif_stream.read_bytes(BLOCK_PREFIX_LEN_BYTE))
+        if prefix is BlockPrefix.Trailer:
+            gif_index.size = gif_stream.pos
+            break
+
+        if prefix is BlockPrefix.Extension:
+            prefix = BlockPrefix(gif_stream.read_bytes(BLOCK_PREFIX_LEN_BYTE))
+
+            if prefix is BlockPrefix.GraphicControlExtension:
+                decode_graphic_control_extension(gif_stream, gif_object)
+                graphic_control_ex = gif_object.graphic_control_extensions[LAST_ELEMENT]
+                graphic_control_offset = offset
+
+            elif prefix is BlockPrefix.ApplicationExtension:
+                decode_application_extension(gif_stream, gif_object)
+                application_ex = gif_object.applications_extensions[LAST_ELEMENT]
+                if (application_ex.application_name + application_ex.identify in LOOPING_APPLICATIONS and
+                        application_ex.data[:1] == bytes([LOOP_SUB_BLOCK_ID])):
+                    gif_index.loop_count = int.from_bytes(application_ex.data[1:1 + LOOP_COUNT_LEN_BYTE], 'little')
+
+            elif prefix is BlockPrefix.PlainTextExtension:
+                gif_stream.skip(gif_stream.read_unsigned_integer(BLOCK_SIZE_LEN_BYTE, 'bytes'), 'bytes')
+                gif_stream.read_sub_block_spans()
+                # the plain text is a graphic rendering block, the graphic control extension before it is its own
+                graphic_control_ex = graphic_control_offset = None
+
+            else:
+                # comment extension or an unknown one, both are only sub blocks
+                gif_stream.read_sub_block_spans()
+
+        elif prefix is BlockPrefix.ImageDescriptor:
+            decode_image_descriptor(gif_stream, gif_object)
+            image = gif_object.images[LAST_ELEMENT]
+            if image.local_color_table_flag:
+                gif_stream.skip(pow(2, image.size_of_local_color_table + 1) * RGB_LEN_BYTE, 'bytes')
+
+            frame_index = FrameIndex(offset, gif_stream.pos, image.left, image.top, image.width, image.height,
+                                     image.local_color_table_flag, image.interlace_flag)
+            if graphic_control_ex is not None:
+                frame_index.graphic_control_offset = graphic_control_offset
+                frame_index.disposal = graphic_control_ex.disposal
+                frame_index.delay_time = graphic_control_ex.delay_time
+                if graphic_control_ex.transparent_color_flag:
+                    frame_index.transparent_index = graphic_control_ex.transparent_index
+            graphic_control_ex = graphic_control_offset = None
+
+            gif_stream.skip(LZW_MINIMUM_CODE_SIZE_LEN_BYTE, 'bytes')
+            gif_stream.read_sub_block_spans()
+            gif_index.frames.append(frame_index)
+
+        elif prefix is BlockPrefix.Terminator:
+            # a stray block terminator between blocks, like read_gif it is skipped
+            continue
+
+        else:
+            raise IncorrectFileFormat("prefix is incorrect")
+
+        gif_index.blocks.append(BlockIndex(prefix, offset, gif_stream.pos - offset))
+
+    gif_index.fingerprint = index_fingerprint(gif_stream, gif_index)
+    return gif_index
+
+
+def index_fingerprint(gif_stream: ByteStreamReader, gif_index: GifIndex) -> str:
+    """the hash of every byte of the gif up to the trailer, an edit anywhere (even of the same size) changes it"""
+    with gif_stream.stream[:gif_index.size] as gif_bytes:
+        return cache_key(gif_bytes)
+
+
+def is_index_of(gif_index: GifIndex, gif_stream: ByteStreamReader) -> bool:
+    """
+    The index was made from this gif: the gif has the trailer where the index ends and the same bytes up to it.
+    """
+    data = gif_stream.stream
+    if gif_index.size is None or gif_index.fingerprint is None or len(data) < gif_index.size or \
+            data[gif_index.size - 1] != BlockPrefix.Trailer.value[0]:
+        return False
+    return index_fingerprint(gif_stream, gif_index) == gif_index.fingerprint
+
+
+def save_index(gif_index: GifIndex, path: str | os.PathLike) -> None:
+    """write the index as json, usually to a sidecar file next to the gif"""
+    index_dict = attrs.asdict(gif_index, value_serializer=lambda _, __, value:
+                              value.name if isinstance(value, BlockPrefix) else value)
+    with open(path, "w") as index_file:
+        json.dump(index_dict, index_file)
+
+
+def load_index(path: str | os.PathLike) -> GifIndex:
+    with open(path) as index_file:
+        index_dict = json.load(index_file)
+
+    frames = [FrameIndex(**frame) for frame in index_dict.pop("frames")]
+    blocks = [BlockIndex(BlockPrefix[block["prefix"]], block["offset"], block["size"])
+              for block in index_dict.pop("blocks")]
+    return GifIndex(**index_dict, frames=frames, blocks=blocks)
@@ -1,23 +1,394 @@
+import collections
 import math
-import bitstring
-from BitStream import BitStreamWriter
+import typing
+from concurrent.futures import ProcessPoolExecutor
+
+from BitStream import ByteStreamWriter
 from reader_writer.constants import *
 from gif import *
 from lzw import lzw_encode
 from utils import chunker
 from .block_prefix import BlockPrefix
+from .frame_cache import cache_key
+from .reader import get_graphic_control_extension
+
+
+def color_index_map(color_table: list[bytes], skip_index: int | None = None) -> dict[bytes, int]:
+    """
+    The index of every color in the table, the first one when a color is in the table more than once.
+    No color is mapped to skip_index.
+    """
+    color_map = {}
+    for index, color in enumerate(color_table):
+        if index != skip_index:
+            color_map.setdefault(color, index)
+    return color_map
+
+
+def index_from_data(image_data: list[bytes], color_table: list[bytes]) -> bytes:
+    """the index of the color of every pixel in color_table"""
+    color_map = color_index_map(color_table)
+    try:
+        return bytes(map(color_map.__getitem__, image_data))
+    except KeyError as e:
+        raise ValueError(f"{e.args[0]} is not in the color table") from None
+
+
+def remap_indices(index_data: bytes, source_table: list[bytes], color_table: list[bytes],
+                  transparent_index: int | None = None) -> bytes:
+    """
+    Map palette indices of source_table to the indices of the same colors in color_table.
+    The mapping is built once per table and applied to all the pixels with one bytes.translate.
+    transparent_index keeps its index, it is the transparent index of the written frame too, so its pixels do not go
+    to an opaque index of the same color, and no other color goes to it.
+    """
+    color_map = color_index_map(color_table, transparent_index)
+    translation = bytearray(PALETTE_SIZE)
+    known_indices = bytearray()
+    for index, color in enumerate(source_table[:PALETTE_SIZE]):
+        if (new_index := color_map.get(color)) is not None:
+            translation[index] = new_index
+            known_indices.append(index)
+    if transparent_index is not None:
+        translation[transparent_index] = transparent_index
+        known_indices.append(transparent_index)
+
+    if unknown_indices := index_data.translate(None, known_indices):
+        raise ValueError(f"the color of index {unknown_indices[0]} is not in the color table")
+    return index_data.translate(translation)
+
+
+def unused_color(colors: typing.Collection[bytes]) -> bytes:
+    """a color that is not in colors"""
+    return next(color for value in range(len(colors) + 1)
+                if (color := value.to_bytes(RGB_LEN_BYTE, 'big')) not in colors)
+
+
+def pad_color_table(colors: list[bytes]) -> list[bytes]:
+    """the colors in a table of the smallest size that can be written (a power of 2), padded with the last color"""
+    size = max(MIN_COLOR_TABLE_SIZE, 1 << (len(colors) - 1).bit_length())
+    return colors + [colors[LAST_ELEMENT]] * (size - len(colors))
+
+
+def table_translation(image: Frame, color_table: list[bytes]) -> bytes | None:
+    """
+    The bytes.translate table from the indices of the frame to the indices of the same colors in color_table.
+    The transparent index goes to an index that no other pixel of the frame goes to and whose color is not before it
+    in color_table (the writer maps every color to its first index). None when the frame does not fit in color_table.
+    """
+    color_map = color_index_map(color_table)
+    transparent_index = image.transparent_index
+    used_indices = set(image.index_data) - {transparent_index}
+    translation = bytearray(PALETTE_SIZE)
+    for index in used_indices:
+        if index >= len(image.color_table) or (new_index := color_map.get(image.color_table[index])) is None:
+            return None
+        translation[index] = new_index
+
+    if transparent_index is not None:
+        taken_indices = {translation[index] for index in used_indices}
+        free_index = next((index for index, color in enumerate(color_table)
+                           if color_map[color] == index and index not in taken_indices), None)
+        if free_index is None:
+            return None
+        translation[transparent_index] = free_index
+    return bytes(translation)
+
+
+def smallest_color_table(images: list[Frame], background_color: bytes | None = None) -> list[bytes] | None:
+    """
+    The colors the frames use, in the order of their tables, plus background_color when given, in the smallest table
+    every one of the frames fits in. None when they use more than 256 colors.
+    """
+    colors = {} if background_color is None else {background_color: None}
+    for image in images:
+        used_indices = set(image.index_data) - {image.transparent_index}
+        colors.update((image.color_table[index], None) for index in sorted(used_indices))
+    colors = list(colors)
+
+    # a color of its own for the transparent index of the frames that use every other color of the table
+    if any(image.transparent_index is not None for image in images) and \
+            any(table_translation(image, pad_color_table(colors or [bytes(RGB_LEN_BYTE)])) is None for image in images):
+        colors.append(unused_color(colors))
+
+    if len(colors) > PALETTE_SIZE:
+        return None
+    return pad_color_table(colors or [bytes(RGB_LEN_BYTE)])
+
+
+def covers_canvas_opaque(gif_object: Gif, image: Frame) -> bool:
+    """the frame covers the whole logical screen with no transparent pixels"""
+    return (image.left == 0 and image.top == 0 and image.width >= gif_object.width and
+            image.height >= gif_object.height and
+            (image.transparent_index is None or image.transparent_index not in image.index_data))
+
+
+def set_color_table(gif_object: Gif, image: Frame, color_table: list[bytes], translation: bytes,
+                    local: bool) -> None:
+    """write the frame with color_table, as its local color table or as the global one"""
+    image.index_data = image.index_data.translate(translation)
+    if image.transparent_index is not None:
+        image.transparent_index = translation[image.transparent_index]
+        gif_object.graphic_control_extensions[image.index_graphic_control_ex].transparent_index = \
+            image.transparent_index
+
+    image.color_table = color_table
+    image.local_color_table_flag = local
+    image.local_color_table = color_table if local else None
+    image.size_of_local_color_table = int(math.log2(len(color_table))) - 1 if local else 0
+
+
+def frame_graphic_controls(gif_object: Gif) -> dict[int, GraphicControlExtension]:
+    """the graphic control extension right before every frame that has one, by the id of the frame"""
+    graphic_controls = {}
+    graphic_control_ex = None
+    for block in gif_object.structure:
+        if isinstance(block, GraphicControlExtension):
+            graphic_control_ex = block
+        elif isinstance(block, Frame):
+            if graphic_control_ex is not None:
+                graphic_controls[id(block)] = graphic_control_ex
+            graphic_control_ex = None
+        elif isinstance(block, PlainTextExtension):
+            graphic_control_ex = None
+    return graphic_controls
+
+
+def add_graphic_control_extension(gif_object: Gif, image: Frame,
+                                  structure: list[typing.Any] | None = None) -> GraphicControlExtension:
+    """a graphic control extension of its own for the frame, right before it in structure (the gif's by default)"""
+    structure = gif_object.structure if structure is None else structure
+    graphic_control_ex = GraphicControlExtension(disposal=DISPOSAL_OPTION_ONE, reserved=0, user_input_flag=False,
+                                                 transparent_color_flag=int(image.transparent_index is not None),
+                                                 transparent_index=image.transparent_index or 0, delay_time=0)
+    # by identity, an equal frame (a repeated one) can be before it
+    position = next(position for position, block in enumerate(structure) if block is image)
+    structure.insert(position, graphic_control_ex)
+    gif_object.graphic_control_extensions.append(graphic_control_ex)
+    image.index_graphic_control_ex = len(gif_object.graphic_control_extensions) - 1
+    return graphic_control_ex
+
+
+def draws_nothing(image: Frame) -> bool:
+    """the frame is decoded and all its pixels are transparent (or it has none)"""
+    if image.decoder is not None:
+        return False
+    if image.transparent_index is None:
+        return not image.index_data
+    return image.index_data.count(image.transparent_index) == len(image.index_data)
+
+
+def frame_content_key(gif_object: Gif, image: Frame) -> str:
+    """
+    The hash of what the frame draws: its rectangle, transparency, color table and pixels. The pixels are the image
+    data as read while the frame did not change, so frames read lazily are not decoded.
+    """
+    color_table = get_color_table(gif_object, image)
+    descriptor = f"{image.left},{image.top},{image.width},{image.height},{image.interlace_flag}," \
+                 f"{image.transparent_index}".encode()
+    if image.is_unchanged(color_table):
+        pixels = (b'compressed', bytes([image.lzw_minimum_code_size]), image.compressed_data)
+    else:
+        pixels = (b'indices', image.index_data)
+    return cache_key(descriptor, b''.join(color_table or []), *pixels)
+
+
+def remove_duplicate_frames(gif_object: Gif) -> int:
+    """
+    Drop the frames that do not change the canvas of the frame before them, and add their delay time to that frame.
+    A frame is dropped when it draws the same pixels in the same rectangle as the frame before it, or draws only
+    transparent pixels, the frame before it is not disposed (so the canvas is the same after both) and the frame
+    itself is not disposed to the previous canvas. The frame before it takes its disposal, so the next frame is
+    drawn on the same canvas.
+    :return: the number of frames dropped
+    """
+    graphic_controls = frame_graphic_controls(gif_object)
+    structure = []
+    dropped = set()
+    # the blocks after the last frame kept
+    pending_blocks = []
+    kept_frame = kept_key = None
+
+    for block in list(gif_object.structure):
+        if not isinstance(block, Frame):
+            pending_blocks.append(block)
+            continue
+
+        graphic_control_ex = graphic_controls.get(id(block))
+        key = frame_content_key(gif_object, block)
+        if kept_frame is not None and all(pending_block is graphic_control_ex for pending_block in pending_blocks) \
+                and is_repeat(gif_object, kept_frame, kept_key, block, key, graphic_control_ex):
+            # a frame with no graphic control extension has no delay and no disposal, kept_frame stays as it is
+            if graphic_control_ex is not None:
+                kept_control_ex = graphic_controls.get(id(kept_frame))
+                if kept_control_ex is None:
+                    kept_control_ex = graphic_controls[id(kept_frame)] = add_graphic_control_extension(
+                        gif_object, kept_frame, structure)
+                kept_control_ex.delay_time += graphic_control_ex.delay_time
+                kept_control_ex.disposal = graphic_control_ex.disposal
+            dropped.add(id(block))
+        else:
+            structure.extend(pending_blocks)
+            structure.append(block)
+            kept_frame, kept_key = block, key
+        pending_blocks = []
+
+    structure.extend(pending_blocks)
+    gif_object.structure = structure
+    gif_object.images = [image for image in gif_object.images if id(image) not in dropped]
+    return len(dropped)
+
+
+def is_repeat(gif_object: Gif, kept_frame: Frame, kept_key: str, image: Frame, key: str,
+              graphic_control_ex: GraphicControlExtension | None) -> bool:
+    """image leaves the canvas after kept_frame as it is, and can be merged into it"""
+    disposal = graphic_control_ex.disposal if graphic_control_ex is not None else None
+    delay_time = graphic_control_ex.delay_time if graphic_control_ex is not None else 0
+    if disposal == DISPOSAL_OPTION_THREE:
+        return False
+
+    kept_control_ex = get_graphic_control_extension(gif_object, kept_frame)
+    if kept_control_ex is not None and (
+            kept_control_ex.disposal in (DISPOSAL_OPTION_TWO, DISPOSAL_OPTION_THREE) or
+            kept_control_ex.delay_time + delay_time > MAX_DELAY_TIME):
+        return False
+
+    if key == kept_key:
+        return True
+    # a frame that draws nothing is disposed on its own rectangle, not on the one of kept_frame
+    return disposal != DISPOSAL_OPTION_TWO and draws_nothing(image)
+
+
+def optimize_color_tables(gif_object: Gif) -> None:
+    """
+    Shrink the color tables of the gif before its frames are encoded.
+    The global table and every local table are trimmed to the colors their frames use, in the smallest table that
+    holds them, so the lzw codes are as narrow as they can be. A frame whose colors fit in a global table that is not
+    larger than its own table drops its local table, and when no frame uses the global table the local table most
+    frames have becomes the global one. Equal local tables are shared.
+    The first frame keeps its indices when the background color shows around it, through it or after its disposal, as
+    its table gives that color.
+    """
+    frames = [block for block in gif_object.structure if isinstance(block, Frame)]
+    if not frames:
+        return
+
+    # the background shows around the first frame, through it, or after it when it is disposed
+    first_control_ex = get_graphic_control_extension(gif_object, frames[0])
+    background_shows = not covers_canvas_opaque(gif_object, frames[0]) or (
+            first_control_ex is not None and first_control_ex.disposal in (DISPOSAL_OPTION_TWO, DISPOSAL_OPTION_THREE))
+    keep_background = any(graphic_control_ex.disposal == DISPOSAL_OPTION_TWO
+                          for graphic_control_ex in gif_object.graphic_control_extensions)
+
+    def is_fixed(image: Frame) -> bool:
+        return (image.color_table is None or (image.index_data and max(image.index_data) >= len(image.color_table)) or
+                (image is frames[0] and background_shows and image.local_color_table_flag))
+
+    local_frames = [frame for frame in frames if frame.local_color_table_flag and not is_fixed(frame)]
+    global_frames = [frame for frame in frames if not frame.local_color_table_flag]
+
+    # the local tables
+    for frame in local_frames:
+        color_table = smallest_color_table([frame])
+        if color_table is not None and len(color_table) < len(frame.color_table):
+            set_color_table(gif_object, frame, color_table, table_translation(frame, color_table), True)
+
+    # the global table, it keeps the background color and the frames may use it
+    if gif_object.global_color_table is not None and global_frames and \
+            not any(is_fixed(frame) for frame in global_frames) and \
+            not (frames[0].local_color_table_flag and background_shows):
+        background_index = gif_object.background_color_index
+        background_color = (gif_object.global_color_table[background_index]
+                            if background_index < len(gif_object.global_color_table) else None)
+        color_table = smallest_color_table(global_frames, background_color)
+        if color_table is not None and len(color_table) < len(gif_object.global_color_table):
+            for frame in global_frames:
+                set_color_table(gif_object, frame, color_table, table_translation(frame, color_table), False)
+            if background_color is not None:
+                gif_object.background_color_index = color_index_map(color_table)[background_color]
+            set_global_color_table(gif_object, color_table)
+
+    # the global table is not used for the background, so the most common local table can take its place
+    if not global_frames and not keep_background:
+        tables = collections.Counter(tuple(frame.color_table) for frame in local_frames)
+        if tables and (most_common := tables.most_common(1)[0])[1] > 1:
+            set_global_color_table(gif_object, list(most_common[0]))
+        elif gif_object.global_color_table is not None:
+            set_global_color_table(gif_object, None)
+
+    if gif_object.global_color_table is not None:
+        for frame in local_frames:
+            if len(gif_object.global_color_table) <= len(frame.color_table) and \
+                    (translation := table_translation(frame, gif_object.global_color_table)) is not None:
+                set_color_table(gif_object, frame, gif_object.global_color_table, translation, False)
+
+    # frames with equal local tables share one table
+    local_color_tables = {}
+    for frame in frames:
+        if frame.local_color_table_flag:
+            frame.local_color_table = frame.color_table = local_color_tables.setdefault(
+                tuple(frame.local_color_table), frame.local_color_table)
+    gif_object.local_color_tables = list(local_color_tables.values())
+
+
+def set_global_color_table(gif_object: Gif, color_table: list[bytes] | None) -> None:
+    gif_object.global_color_table = color_table
+    gif_object.global_color_table_size = len(color_table) if color_table is not None else 0
+
+
+def encode_image(image: Frame, color_table: list[bytes]) -> bytes:
+    """lzw encode the frame with color_table, its indices are remapped only when its own color table is another one"""
+    if image.color_table is None:
+        data = b''
+    elif image.color_table is color_table or image.color_table == color_table:
+        data = image.index_data
+    else:
+        data = remap_indices(image.index_data, image.color_table, color_table, image.transparent_index)
+    return lzw_encode(data, len(color_table))
+
 
+def encode_images(gif_object: Gif, workers: int, remux: bool = False) -> dict[int, bytes]:
+    """
+    lzw encode all the frames of the gif in a process pool (in remux mode only the frames that changed).
+    only the palette indices, the color tables and the transparent indices are sent to the workers.
+    :return: the encoded image data of every frame, by the id of the frame
+    """
+    frames = [block for block in gif_object.structure if isinstance(block, Frame) and
+              not (remux and block.is_unchanged(get_color_table(gif_object, block)))]
+    frames_to_send = [Frame(index_data=frame.index_data, color_table=frame.color_table,
+                            transparent_index=frame.transparent_index) for frame in frames]
+    color_tables = [get_color_table(gif_object, frame) for frame in frames]
 
-def index_from_data(image_data, color_table):
-    size_of_index = math.ceil(math.log(len(color_table), 2)) + 1
-    data = bitstring.BitArray()
-    for color in image_data:
-        data.append(f"uint:{size_of_index}={color_table.index(color)}")
-    return data
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        encoded_images = executor.map(encode_image, frames_to_send, color_tables)
+        return {id(frame): encoded for frame, encoded in zip(frames, encoded_images)}
 
 
-def write_gif(gif_object: Gif, max_clean: bool) -> BitStreamWriter:
-    gif_stream = BitStreamWriter()
+def get_color_table(gif_object: Gif, image: Frame) -> list[bytes]:
+    if image.local_color_table_flag:
+        return image.local_color_table
+    return gif_object.global_color_table
+
+
+def write_gif(gif_object: Gif, max_clean: bool, workers: int | None = None, remux: bool = False,
+              optimize_palettes: bool = False, drop_duplicates: bool = False) -> ByteStreamWriter:
+    """
+    Encode the gif.
+    When workers is given the frames are lzw encoded in parallel by that many processes before the blocks are
+    written in order, the output is the same as the serial one.
+    In remux mode the frames whose pixels and color table did not change since they were read are written with their
+    original image data, without decoding or encoding them.
+    With drop_duplicates the frames that repeat the canvas before them are dropped first and their delay time goes
+    to the frame they repeat (see remove_duplicate_frames), with optimize_palettes the color tables of gif_object
+    are shrunk (see optimize_color_tables).
+    """
+    if drop_duplicates:
+        remove_duplicate_frames(gif_object)
+    if optimize_palettes:
+        optimize_color_tables(gif_object)
+
+    gif_stream = ByteStreamWriter()
+    encoded_images = encode_images(gif_object, workers, remux) if workers else {}
 
     write_header(gif_stream, gif_object)
     write_logical_screen_descriptor(gif_stream, gif_object)
@@ -25,34 +396,87 @@ def write_gif(gif_object: Gif, max_clean: bool) -> BitStreamWriter:
     if gif_object.global_color_table_size > MIN_TABLE_SIZE:
         write_global_color_table(gif_stream, gif_object.global_color_table)
     for block in gif_object.structure:
-        if isinstance(block, Frame):
-            if block.local_color_table_flag:
-                write_image(gif_stream, block, block.local_color_table)
-            else:
-                write_image(gif_stream, block, gif_object.global_color_table)
-        elif isinstance(block, CommentExtension):
-            # not write comment block if max clean is true
-            if not max_clean:
-                write_comment_extension(gif_stream, block)
-        elif isinstance(block, PlainTextExtension):
-            write_plain_text(gif_stream, block)
-        elif isinstance(block, GraphicControlExtension):
-            write_graphic_control_extension(gif_stream, block)
-        elif isinstance(block, ApplicationExtension):
-            write_application_extension(gif_stream, block)
-        else:
-            raise Exception("not a gif object in structure")
+        write_block(gif_stream, gif_object, block, max_clean, encoded_images.get(id(block)), remux)
 
     gif_stream.write_bytes(BlockPrefix.Trailer.value)
     return gif_stream
 
 
-def write_header(gif_stream: BitStreamWriter, gif_object: Gif) -> None:
+class GifStreamWriter:
+    """
+    Write a gif to a file block by block.
+    The header, logical screen descriptor and global color table of gif_object are written when the writer is
+    created, every block passed to write is encoded and flushed to the file right away, and close adds the trailer.
+    When an exception leaves the with block the trailer is not written.
+    """
+
+    def __init__(self, file: typing.BinaryIO, gif_object: Gif, max_clean: bool = False, remux: bool = False) -> None:
+        self._file = file
+        self._gif_object = gif_object
+        self._max_clean = max_clean
+        self._remux = remux
+        self._gif_stream = ByteStreamWriter()
+        self._closed = False
+
+        write_header(self._gif_stream, gif_object)
+        write_logical_screen_descriptor(self._gif_stream, gif_object)
+
+        if gif_object.global_color_table_size > MIN_TABLE_SIZE:
+            write_global_color_table(self._gif_stream, gif_object.global_color_table)
+        self._gif_stream.flush(self._file)
+
+    def write(self, block: typing.Any) -> None:
+        if self._closed:
+            raise ValueError("write to a closed GifStreamWriter")
+        write_block(self._gif_stream, self._gif_object, block, self._max_clean, remux=self._remux)
+        self._gif_stream.flush(self._file)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._gif_stream.write_bytes(BlockPrefix.Trailer.value)
+        self._gif_stream.flush(self._file)
+        self._closed = True
+
+    def __enter__(self) -> "GifStreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        # a gif that stopped in the middle gets no trailer, so it is not taken for a complete one
+        if exc_type is None:
+            self.close()
+        else:
+            self._closed = True
+
+
+def write_block(gif_stream: ByteStreamWriter, gif_object: Gif, block: typing.Any, max_clean: bool,
+                encoded: bytes | None = None, remux: bool = False) -> None:
+    if isinstance(block, Frame):
+        color_table = get_color_table(gif_object, block)
+        if remux and block.is_unchanged(color_table):
+            write_image(gif_stream, block, color_table, block.compressed_data, block.lzw_minimum_code_size)
+        else:
+            write_image(gif_stream, block, color_table, encoded)
+    elif isinstance(block, CommentExtension):
+        # not write comment block if max clean is true
+        if not max_clean:
+            write_comment_extension(gif_stream, block)
+    elif isinstance(block, PlainTextExtension):
+        write_plain_text(gif_stream, block)
+    elif isinstance(block, GraphicControlExtension):
+        write_graphic_control_extension(gif_stream, block)
+    elif isinstance(block, ApplicationExtension):
+        write_application_extension(gif_stream, block)
+    else:
+        raise Exception("not a gif object in structure")
+
+
+def write_header(gif_stream: ByteStreamWriter, gif_object: Gif) -> None:
     version_bytes = gif_object.version.encode()
     gif_stream.write_bytes(version_bytes)
 
 
-def write_logical_screen_descriptor(gif_stream: BitStreamWriter, gif_object: Gif) -> None:
+def write_logical_screen_descriptor(gif_stream: ByteStreamWriter, gif_object: Gif) -> None:
     gif_stream.write_unsigned_integer(gif_object.width, GIF_WIDTH_LEN_BYTE, 'bytes')
     gif_stream.write_unsigned_integer(gif_object.height, GIF_HEIGHT_LEN_BYTE, 'bytes')
 
@@ -76,11 +500,11 @@ def write_logical_screen_descriptor(gif_stream: BitStreamWriter, gif_object: Gif
     gif_stream.write_unsigned_integer(pixel_ratio_value, GIF_PIXEL_RATIO_VALUE_LEN_BYTE, 'bytes')
 
 
-def write_global_color_table(gif_stream: BitStreamWriter, global_color_table: list[bytes]) -> None:
+def write_global_color_table(gif_stream: ByteStreamWriter, global_color_table: list[bytes]) -> None:
     gif_stream.write_bytes(b''.join(global_color_table))
 
 
-def write_application_extension(gif_stream: BitStreamWriter, application_ex: ApplicationExtension) -> None:
+def write_application_extension(gif_stream: ByteStreamWriter, application_ex: ApplicationExtension) -> None:
     gif_stream.write_bytes(BlockPrefix.Extension.value)
     gif_stream.write_bytes(BlockPrefix.ApplicationExtension.value)
     gif_stream.write_unsigned_integer(APPLICATION_EXTENSION_BLOCK_SIZE, APPLICATION_EXTENSION_BLOCK_SIZE_LEN_BYTE,
@@ -98,7 +522,7 @@ def write_application_extension(gif_stream: BitStreamWriter, application_ex: App
     gif_stream.write_bytes(BlockPrefix.Terminator.value)
 
 
-def write_graphic_control_extension(gif_stream: BitStreamWriter, graphic_control_ex: GraphicControlExtension) -> None:
+def write_graphic_control_extension(gif_stream: ByteStreamWriter, graphic_control_ex: GraphicControlExtension) -> None:
     gif_stream.write_bytes(BlockPrefix.Extension.value)
     gif_stream.write_bytes(BlockPrefix.GraphicControlExtension.value)
 
@@ -117,7 +541,8 @@ def write_graphic_control_extension(gif_stream: BitStreamWriter, graphic_control
     gif_stream.write_bytes(BlockPrefix.Terminator.value)
 
 
-def write_image(gif_stream: BitStreamWriter, image: Frame, color_table: list[bytes]) -> None:
+def write_image(gif_stream: ByteStreamWriter, image: Frame, color_table: list[bytes],
+                encoded: bytes | None = None, lzw_minimum_code_size: int | None = None) -> None:
     # Image Descriptor
     gif_stream.write_bytes(BlockPrefix.ImageDescriptor.value)
     gif_stream.write_unsigned_integer(image.left, FRAME_LEFT_LEN_BYTE, 'bytes')
@@ -137,10 +562,12 @@ def write_image(gif_stream: BitStreamWriter, image: Frame, color_table: list[byt
         gif_stream.write_bytes(b''.join(image.local_color_table))
 
     # Image Data
-    gif_stream.write_unsigned_integer(int(math.ceil(math.log2(len(color_table)))), COLOR_TABLE_FLAG_LEN_BYTE, 'bytes')
+    if lzw_minimum_code_size is None:
+        lzw_minimum_code_size = int(math.ceil(math.log2(len(color_table))))
+    gif_stream.write_unsigned_integer(lzw_minimum_code_size, COLOR_TABLE_FLAG_LEN_BYTE, 'bytes')
 
-    data = index_from_data(image.raw_data, color_table)
-    encoded = lzw_encode(data, len(color_table))
+    if encoded is None:
+        encoded = encode_image(image, color_table)
 
     if encoded:
         # looping in chunks of 255 bytes
@@ -152,7 +579,7 @@ def write_image(gif_stream: BitStreamWriter, image: Frame, color_table: list[byt
     gif_stream.write_bytes(BlockPrefix.Terminator.value)
 
 
-def write_comment_extension(gif_stream: BitStreamWriter, comment: CommentExtension) -> None:
+def write_comment_extension(gif_stream: ByteStreamWriter, comment: CommentExtension) -> None:
     gif_stream.write_bytes(BlockPrefix.Extension.value)
     gif_stream.write_bytes(BlockPrefix.CommentExtension.value)
 
@@ -165,7 +592,7 @@ def write_comment_extension(gif_stream: BitStreamWriter, comment: CommentExtensi
     gif_stream.write_bytes(BlockPrefix.Terminator.value)
 
 
-def write_plain_text(gif_stream: BitStreamWriter, plain_text: PlainTextExtension) -> None:
+def write_plain_text(gif_stream: ByteStreamWriter, plain_text: PlainTextExtension) -> None:
     gif_stream.write_bytes(BlockPrefix.Extension.value)
     gif_stream.write_bytes(BlockPrefix.PlainTextExtension.value)
 
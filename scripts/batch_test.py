@@ -0,0 +1,44 @@
+import os
+import shutil
+import signal
+import tempfile
+
+import batch
+
+TEST_GIFS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Test_gifs")
+KILLER_FILENAME = "kill.gif"
+transcode_file = batch.transcode_file
+
+
+def transcode_or_die(input_path: str, output_path: str, *args) -> batch.FileResult:
+    """transcode_file, but the worker is killed (like by the OOM killer) while it writes the killer file"""
+    if os.path.basename(input_path) == KILLER_FILENAME:
+        with open(batch.temp_path_of(output_path), "wb") as temp_file:
+            temp_file.write(b"GIF89a")
+        os.kill(os.getpid(), signal.SIGKILL)
+    return transcode_file(input_path, output_path, *args)
+
+
+def test_killed_worker_fails_only_its_file() -> None:
+    batch.transcode_file = transcode_or_die
+    try:
+        with tempfile.TemporaryDirectory() as gif_dir, tempfile.TemporaryDirectory() as output_dir:
+            filenames = [f"giphy36_{number}.gif" for number in range(6)] + [KILLER_FILENAME]
+            for filename in filenames:
+                shutil.copy(os.path.join(TEST_GIFS_DIR, "giphy36.gif"), os.path.join(gif_dir, filename))
+
+            results = {result.filename: result for result in batch.main(gif_dir, output_dir, workers=2)}
+            output_files = sorted(os.listdir(output_dir))
+    finally:
+        batch.transcode_file = transcode_file
+
+    assert sorted(results) == sorted(filenames)
+    assert not results[KILLER_FILENAME].ok and results[KILLER_FILENAME].reason.startswith("worker failed")
+    assert all(result.ok for filename, result in results.items() if filename != KILLER_FILENAME)
+    # the half written temporary file of the killed worker is removed
+    assert output_files == sorted(filename for filename in filenames if filename != KILLER_FILENAME)
+
+
+if __name__ == '__main__':
+    test_killed_worker_fails_only_its_file()
+    print("a killed worker failed only its own file and left no temporary file")
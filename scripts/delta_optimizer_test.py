@@ -0,0 +1,41 @@
+import io
+import os
+
+from random_gifs import random_gif, rendered_frames
+from reader_writer import read_gif, write_gif, optimize_deltas
+
+TEST_GIFS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Test_gifs")
+SEEDS = range(300)
+# the second frame repeats the first one and gets a graphic control extension of its own
+REPEATED_FRAME_SEED = 33
+
+
+def optimize(gif_data: bytes) -> bytes:
+    gif = read_gif(io.BytesIO(gif_data), True)
+    optimize_deltas(gif)
+    return bytes(write_gif(gif, False, remux=True).stream)
+
+
+def test_repeated_frame() -> None:
+    gif_data = random_gif(REPEATED_FRAME_SEED)
+    assert rendered_frames(optimize(gif_data)) == rendered_frames(gif_data)
+
+
+def test_optimized_deltas_render_the_same() -> None:
+    changed = [seed for seed in SEEDS if rendered_frames(optimize(random_gif(seed))) != rendered_frames(random_gif(seed))]
+    assert not changed, f"the frames of the gifs of seeds {changed} changed"
+
+
+def test_test_gif_is_not_larger() -> None:
+    with open(os.path.join(TEST_GIFS_DIR, "giphy36.gif"), "rb") as gif_file:
+        gif_data = gif_file.read()
+    optimized = optimize(gif_data)
+    assert rendered_frames(optimized) == rendered_frames(gif_data)
+    assert len(optimized) <= len(gif_data)
+
+
+if __name__ == '__main__':
+    test_repeated_frame()
+    test_optimized_deltas_render_the_same()
+    test_test_gif_is_not_larger()
+    print(f"the optimized deltas of {len(SEEDS)} random gifs and of giphy36 render the same frames")
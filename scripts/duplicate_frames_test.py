@@ -0,0 +1,39 @@
+import io
+
+from random_gifs import random_gif
+from reader_writer import read_gif, write_gif
+from reader_writer.reader import get_graphic_control_extension
+
+SEEDS = range(300)
+
+
+def timeline(gif_data: bytes) -> tuple[list[bytes], bytes | None]:
+    """every canvas once for every hundredth of a second it is shown, and the last canvas"""
+    gif = read_gif(io.BytesIO(gif_data), True)
+    canvases = []
+    for image in gif.images:
+        graphic_control_ex = get_graphic_control_extension(gif, image)
+        delay_time = graphic_control_ex.delay_time if graphic_control_ex is not None else 0
+        canvases.extend([bytes(image.image_data or b'')] * delay_time)
+    return canvases, bytes(gif.images[-1].image_data or b'') if gif.images else None
+
+
+def drop_duplicates(gif_data: bytes) -> bytes:
+    return bytes(write_gif(read_gif(io.BytesIO(gif_data), False), False, drop_duplicates=True).stream)
+
+
+def test_dropped_frames_keep_the_timeline() -> None:
+    changed = [seed for seed in SEEDS if timeline(drop_duplicates(random_gif(seed))) != timeline(random_gif(seed))]
+    assert not changed, f"the timelines of the gifs of seeds {changed} changed"
+
+
+def test_repeated_frames_are_dropped() -> None:
+    frame_counts = [(len(read_gif(io.BytesIO(drop_duplicates(random_gif(seed))), False).images),
+                     len(read_gif(io.BytesIO(random_gif(seed)), False).images)) for seed in SEEDS]
+    assert any(dropped < count for dropped, count in frame_counts)
+
+
+if __name__ == '__main__':
+    test_dropped_frames_keep_the_timeline()
+    test_repeated_frames_are_dropped()
+    print(f"dropping the repeated frames of {len(SEEDS)} random gifs keeps their timelines")
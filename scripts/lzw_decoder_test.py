@@ -0,0 +1,52 @@
+import glob
+import io
+import os
+
+from PIL import Image
+
+from reader_writer import read_gif
+from lzw import lzw_decode
+
+TEST_GIFS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Test_gifs")
+MAX_SUB_BLOCK_SIZE = 255
+
+
+def single_frame_gif(width: int, height: int, lzw_minimum_code_size: int, compressed_data: bytes) -> bytes:
+    """a gif of only this image data, not interlaced, with a grey 256 colors global table"""
+    data = bytearray(b'GIF89a')
+    data += width.to_bytes(2, 'little') + height.to_bytes(2, 'little') + bytes([0xf7, 0, 0])
+    data += b''.join(bytes([index] * 3) for index in range(256))
+    data += b'\x2c' + bytes(4) + width.to_bytes(2, 'little') + height.to_bytes(2, 'little') + b'\x00'
+    data.append(lzw_minimum_code_size)
+    for start in range(0, len(compressed_data), MAX_SUB_BLOCK_SIZE):
+        sub_block = compressed_data[start: start + MAX_SUB_BLOCK_SIZE]
+        data += bytes([len(sub_block)]) + sub_block
+    data += b'\x00\x3b'
+    return bytes(data)
+
+
+def pillow_indices(width: int, height: int, lzw_minimum_code_size: int, compressed_data: bytes) -> bytes:
+    """the palette indices Pillow decodes from the image data"""
+    with Image.open(io.BytesIO(single_frame_gif(width, height, lzw_minimum_code_size, compressed_data))) as image:
+        return image.tobytes()
+
+
+def test_lzw_decode_matches_pillow() -> None:
+    paths = sorted(glob.glob(os.path.join(TEST_GIFS_DIR, "**", "*.gif"), recursive=True))
+    assert paths
+    mismatches = []
+    for path in paths:
+        gif = read_gif(path, False, lazy=True)
+        for number, frame in enumerate(gif.images):
+            if not frame.compressed_data:
+                continue
+            indices = lzw_decode(frame.compressed_data, frame.lzw_minimum_code_size)
+            expected = pillow_indices(frame.width, frame.height, frame.lzw_minimum_code_size, frame.compressed_data)
+            if indices[:len(expected)] != expected:
+                mismatches.append(f"{os.path.relpath(path, TEST_GIFS_DIR)} frame {number}")
+    assert not mismatches, f"lzw_decode differs from Pillow on {mismatches}"
+
+
+if __name__ == '__main__':
+    test_lzw_decode_matches_pillow()
+    print("lzw_decode gives the same indices as Pillow for every frame of Test_gifs")
@@ -0,0 +1,30 @@
+import io
+
+from random_gifs import random_gif, rendered_frames
+from reader_writer import read_gif, write_gif
+
+SEEDS = range(300)
+# the first frame covers the canvas with a local color table and is disposed to the previous canvas, so the
+# background color of its table shows after it
+FIRST_FRAME_DISPOSED_SEED = 71
+
+
+def optimize_palettes(gif_data: bytes) -> bytes:
+    return bytes(write_gif(read_gif(io.BytesIO(gif_data), False), False, optimize_palettes=True).stream)
+
+
+def test_first_frame_disposed_keeps_background() -> None:
+    gif_data = random_gif(FIRST_FRAME_DISPOSED_SEED)
+    assert rendered_frames(optimize_palettes(gif_data)) == rendered_frames(gif_data)
+
+
+def test_optimized_palettes_render_the_same() -> None:
+    changed = [seed for seed in SEEDS
+               if rendered_frames(optimize_palettes(random_gif(seed))) != rendered_frames(random_gif(seed))]
+    assert not changed, f"the frames of the gifs of seeds {changed} changed"
+
+
+if __name__ == '__main__':
+    test_first_frame_disposed_keeps_background()
+    test_optimized_palettes_render_the_same()
+    print(f"the optimized palettes of {len(SEEDS)} random gifs render the same frames")
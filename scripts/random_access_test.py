@@ -0,0 +1,71 @@
+import glob
+import io
+import os
+import sys
+import tempfile
+
+from random_gifs import random_gif
+from reader_writer import read_gif, get_frame, index_gif
+
+TEST_GIFS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Test_gifs")
+SEEDS = range(300)
+# compositing every frame of Test_gifs on its own takes minutes, the tests check every tenth frame and the last one
+# (run this script with --all to check all of them)
+FRAME_STEP = 10
+# the first frame has a local color table and is disposed to the previous canvas, so the second frame is drawn on
+# the background color of that table
+FIRST_FRAME_DISPOSED_SEED = 71
+# the delay time follows the introducer, the label, the block size and the packed byte of the graphic control extension
+DELAY_TIME_OFFSET = 4
+
+
+def differing_frames(gif_data: bytes, frame_step: int = 1) -> list[int]:
+    """the frames that get_frame composites differently from read_gif"""
+    frames = read_gif(io.BytesIO(gif_data), True).images
+    gif_index = index_gif(io.BytesIO(gif_data))
+    numbers = sorted({*range(0, len(frames), frame_step), len(frames) - 1} & set(range(len(frames))))
+    return [n for n in numbers if get_frame(io.BytesIO(gif_data), n, gif_index).image_data != frames[n].image_data]
+
+
+def check_test_gifs(frame_step: int) -> None:
+    changed = {}
+    for path in sorted(glob.glob(os.path.join(TEST_GIFS_DIR, "**", "*.gif"), recursive=True)):
+        with open(path, "rb") as gif_file:
+            if frames := differing_frames(gif_file.read(), frame_step):
+                changed[os.path.relpath(path, TEST_GIFS_DIR)] = frames
+    assert not changed, f"get_frame differs from read_gif on {changed}"
+
+
+def test_first_frame_disposed() -> None:
+    assert not differing_frames(random_gif(FIRST_FRAME_DISPOSED_SEED))
+
+
+def test_random_gifs_frames() -> None:
+    changed = {seed: frames for seed in SEEDS if (frames := differing_frames(random_gif(seed)))}
+    assert not changed, f"get_frame differs from read_gif on the gifs of seeds {changed}"
+
+
+def test_test_gifs_frames() -> None:
+    check_test_gifs(FRAME_STEP)
+
+
+def test_edited_gif_is_scanned_again() -> None:
+    with open(os.path.join(TEST_GIFS_DIR, "giphy36.gif"), "rb") as gif_file:
+        gif_data = bytearray(gif_file.read())
+    with tempfile.TemporaryDirectory() as directory:
+        index_path = os.path.join(directory, "giphy36.gif.index")
+        graphic_control_offset = index_gif(io.BytesIO(gif_data), index_path).frames[-1].graphic_control_offset
+
+        # the same size, only the delay of the last frame changes
+        delay_offset = graphic_control_offset + DELAY_TIME_OFFSET
+        gif_data[delay_offset: delay_offset + 2] = (int.from_bytes(gif_data[delay_offset: delay_offset + 2], 'little')
+                                                    + 1).to_bytes(2, 'little')
+        assert index_gif(io.BytesIO(gif_data), index_path) == index_gif(io.BytesIO(gif_data))
+
+
+if __name__ == '__main__':
+    test_first_frame_disposed()
+    test_edited_gif_is_scanned_again()
+    test_random_gifs_frames()
+    check_test_gifs(1 if "--all" in sys.argv else FRAME_STEP)
+    print(f"get_frame composites the frames of Test_gifs and of {len(SEEDS)} random gifs like read_gif")
@@ -0,0 +1,112 @@
+import io
+import random
+
+from reader_writer import read_gif
+
+# colors of the random color tables, few of them so the tables have repeated colors
+COLOR_POOL_SIZE = 6
+MAX_SIDE = 12
+MAX_FRAMES = 5
+MAX_SUB_BLOCK_SIZE = 255
+
+
+def literal_lzw(indices: bytes, min_code_size: int) -> bytes:
+    """
+    lzw image data that writes every index as its own code, with a clear code often enough that the code width
+    never grows. It does not depend on the lzw encoder of the repository.
+    """
+    clear_code = 1 << min_code_size
+    code_width = min_code_size + 1
+    run_length = max(2, clear_code - 4)
+
+    codes = []
+    for start in range(0, len(indices), run_length):
+        codes.append(clear_code)
+        codes.extend(indices[start: start + run_length])
+    codes.append(clear_code + 1)
+
+    bits = sum(code << (position * code_width) for position, code in enumerate(codes))
+    return bits.to_bytes((len(codes) * code_width + 7) // 8, 'little')
+
+
+def sub_blocks(data: bytes) -> bytes:
+    blocks = b''.join(bytes([len(data[start: start + MAX_SUB_BLOCK_SIZE])]) + data[start: start + MAX_SUB_BLOCK_SIZE]
+                      for start in range(0, len(data), MAX_SUB_BLOCK_SIZE))
+    return blocks + b'\x00'
+
+
+def random_gif(seed: int) -> bytes:
+    """
+    A small random gif: global and local color tables with repeated colors, every disposal, transparency, frames
+    without a graphic control extension and frames that repeat the frame before.
+    """
+    rng = random.Random(seed)
+    pool = [rng.randbytes(3) for _ in range(COLOR_POOL_SIZE)]
+    width, height = rng.randint(1, MAX_SIDE), rng.randint(1, MAX_SIDE)
+
+    def color_table() -> tuple[int, list[bytes]]:
+        # 4 colors and more, write_gif gives a table of 2 colors the lzw minimum code size 1 that read_gif rejects
+        size_code = rng.randint(1, 7)
+        return size_code, [rng.choice(pool) for _ in range(2 << size_code)]
+
+    global_table = color_table() if rng.random() < 0.8 else None
+    background_index = rng.randrange(256) if rng.random() < 0.2 else rng.randrange(4)
+
+    data = bytearray(b'GIF89a')
+    data += width.to_bytes(2, 'little') + height.to_bytes(2, 'little')
+    data.append((0x80 | global_table[0] if global_table else 0) | 0x70)
+    data += bytes([background_index, 0])
+    if global_table:
+        data += b''.join(global_table[1])
+    data += b'\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00'
+
+    previous_frame = None
+    for _ in range(rng.randint(1, MAX_FRAMES)):
+        local_table = color_table() if global_table is None or rng.random() < 0.4 else None
+        size_code, table = local_table or global_table
+
+        if previous_frame is not None and rng.random() < 0.2:
+            # the same frame again
+            data += previous_frame
+            continue
+
+        transparent_index = rng.randrange(len(table)) if rng.random() < 0.5 else None
+        frame = bytearray()
+        if rng.random() < 0.8:
+            packed = rng.randint(0, 3) << 2 | (transparent_index is not None)
+            frame += bytes([0x21, 0xf9, 4, packed]) + rng.randint(0, 20).to_bytes(2, 'little')
+            frame += bytes([transparent_index or 0, 0])
+        else:
+            transparent_index = None
+
+        left, top = rng.randrange(width), rng.randrange(height)
+        if rng.random() < 0.4:
+            left = top = 0
+            frame_width, frame_height = width, height
+        else:
+            frame_width, frame_height = rng.randint(1, width - left), rng.randint(1, height - top)
+
+        frame += b'\x2c' + b''.join(value.to_bytes(2, 'little') for value in (left, top, frame_width, frame_height))
+        frame.append(0x80 | size_code if local_table else 0)
+        if local_table:
+            frame += b''.join(table)
+
+        used_indices = rng.sample(range(len(table)), rng.randint(1, min(4, len(table))))
+        if transparent_index is not None and rng.random() < 0.7:
+            used_indices.append(transparent_index)
+        indices = bytes(rng.choice(used_indices) for _ in range(frame_width * frame_height))
+
+        min_code_size = max(2, size_code + 1)
+        frame.append(min_code_size)
+        frame += sub_blocks(literal_lzw(indices, min_code_size))
+        data += frame
+        previous_frame = frame
+
+    data += b'\x3b'
+    return bytes(data)
+
+
+def rendered_frames(gif_data: bytes) -> list[bytes]:
+    """the canvas after every frame, as read_gif composites it"""
+    gif = read_gif(io.BytesIO(gif_data), True)
+    return [bytes(image.image_data) if image.image_data is not None else None for image in gif.images]